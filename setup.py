@@ -32,10 +32,18 @@ setup(
     python_requires=">=3.8",
     install_requires=requirements,
     extras_require={
+        # 可选加速依赖，未安装时回退到标准库实现
+        "speedups": [
+            "pyahocorasick>=2.0.0",
+            "xxhash>=3.0.0",
+            "orjson>=3.9.0"
+        ],
         "dev": [
-            "pytest>=7.0.0",
-            "pytest-asyncio>=0.21.0",
+            "pytest>=8.2.0",
+            "pytest-asyncio>=1.0.0",
             "pytest-cov>=4.0.0",
+            "pytest-xdist>=3.0.0",
+            "pytest-benchmark>=4.0.0",
             "black>=23.0.0",
             "flake8>=6.0.0",
             "isort>=5.12.0",
@@ -5,6 +5,6 @@
 """
 
 from .ui_adapter import UIAdapter
-from .evidence_enhancer import EvidenceEnhancer
+from .evidence_enhancer import EvidenceEnhancer, EvictionPolicy
 
-__all__ = ['UIAdapter', 'EvidenceEnhancer']
\ No newline at end of file
+__all__ = ['UIAdapter', 'EvidenceEnhancer', 'EvictionPolicy']
\ No newline at end of file
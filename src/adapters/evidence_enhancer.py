@@ -10,13 +10,376 @@
 """
 
 import re
+import sys
+import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import difflib
+import functools
+from bisect import bisect_right
+from collections import OrderedDict
+from enum import Enum
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple, Union
 from datetime import datetime
 import hashlib
 
+import jieba
+import numpy as np
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # rapidfuzz为可选依赖，缺失时回退到difflib
+    fuzz = process = None
+
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str)
+except ImportError:  # orjson为可选依赖，缺失时回退到标准库
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, default=str).encode('utf-8')
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick为可选依赖，缺失时回退到逐个关键词匹配
+    ahocorasick = None
+
+try:
+    import xxhash
+except ImportError:  # xxhash为可选依赖，缺失时使用blake2b
+    xxhash = None
+
 logger = logging.getLogger(__name__)
 
+# 证据匹配类型，驻留后字典比较可直接走指针相等的快速路径
+MATCH_EXACT = sys.intern("exact")
+MATCH_KEYWORD = sys.intern("keyword")
+MATCH_FUZZY = sys.intern("fuzzy")
+MATCH_FALLBACK = sys.intern("fallback")
+MATCH_SIMPLE = sys.intern("simple_fallback")
+
+# 关键词/模糊匹配的分数阈值 (0-1) 与单条证据最多返回的匹配数
+_KEYWORD_THRESHOLD = 0.3
+_FUZZY_THRESHOLD = 0.2
+_MAX_MATCHES = 3
+
+# 级联模糊匹配：稀疏召回候选数不足时用双字片段扩召回，最终置信度按权重混合
+_MIN_FUZZY_CANDIDATES = 5
+_SPARSE_WEIGHT = 0.6
+_FUZZY_WEIGHT = 0.4
+
+# 截断引用时优先使用的句子结束符
+_SENTENCE_ENDS = ('。', '！', '？')
+_SENTENCE_END_BYTES = tuple(mark.encode('utf-8') for mark in _SENTENCE_ENDS)
+
+# 按对象身份缓存的processed_text预处理结果数量上限
+_PREPARED_CACHE_SIZE = 32
+
+# 关键词提取：只保留中文或英文词，并过滤停用词
+_KEYWORD_TOKEN_RE = re.compile(r'[\u4e00-\u9fff]+|[a-zA-Z]+')
+
+# 证据格式：单个交替分支，按顺序依次尝试
+#   格式1: "姓名 日期 内容"
+#   格式2: "时间戳: 内容"
+# 都不匹配时视为纯内容（无时间信息）
+_EVIDENCE_RE = re.compile(
+    r'^(?:'
+    r'(?P<speaker>.+?)\s+(?P<date>\d{4}年\d{1,2}月\d{1,2}日|\d{4}-\d{1,2}-\d{1,2})\s+(?P<body>.+)'
+    r'|(?P<time>\d{1,2}:\d{1,2}:\d{1,2}|\d{1,2}:\d{1,2})\s*[:：]\s*(?P<tail>.+)'
+    r')$',
+    re.DOTALL
+)
+_STOP_WORDS = frozenset({'的', '了', '在', '是', '我', '你', '他', '她', '它', '我们', '你们', '他们'})
+
+
+def _digest(data: bytes) -> str:
+    """计算缓存键使用的128位摘要"""
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=8192)
+def _tokenize_zh(text: str) -> Tuple[str, ...]:
+    """jieba分词，结果以元组缓存，重复的证据/对话文本直接命中缓存"""
+    return tuple(jieba.lcut(text))
+
+
+def _intern(value: Any) -> Any:
+    """驻留字符串，非字符串原样返回"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _evidence_body(evidence_text: str) -> str:
+    """取出证据文本中用于匹配的正文部分，与 _parse_evidence_text 得到的 content 一致"""
+    content = evidence_text.strip()
+    match = _EVIDENCE_RE.match(content)
+    if match:
+        body = match.group("body") if match.group("date") is not None else match.group("tail")
+        return body.strip()
+    return content
+
+
+def _is_keyword_token(word: str) -> bool:
+    """判断分词结果是否可作为关键词（过滤标点、数字、短词和停用词）"""
+    return len(word) > 1 and word not in _STOP_WORDS and _KEYWORD_TOKEN_RE.fullmatch(word) is not None
+
+
+@functools.lru_cache(maxsize=256)
+def _build_automaton(keywords: Tuple[str, ...]) -> "ahocorasick.Automaton":
+    """构建关键词的Aho-Corasick自动机，结果按关键词元组缓存
+
+    Args:
+        keywords: 去重后的非空关键词元组
+
+    Returns:
+        ahocorasick.Automaton: 值为关键词在元组中下标的自动机
+    """
+    automaton = ahocorasick.Automaton()
+    for i, keyword in enumerate(keywords):
+        automaton.add_word(keyword, i)
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_timestamp(timestamp_str: str) -> Optional[str]:
+    """标准化时间戳字符串，结果按输入缓存
+
+    Args:
+        timestamp_str: 时间戳字符串
+
+    Returns:
+        Optional[str]: 标准化的时间戳，无法解析时返回None
+    """
+    try:
+        # 尝试解析中文日期格式
+        if '年' in timestamp_str and '月' in timestamp_str and '日' in timestamp_str:
+            # 转换为标准格式
+            timestamp_str = timestamp_str.replace('年', '-').replace('月', '-').replace('日', '')
+            datetime.strptime(timestamp_str, '%Y-%m-%d')
+            return timestamp_str
+
+        # 尝试解析ISO格式
+        if '-' in timestamp_str:
+            datetime.strptime(timestamp_str, '%Y-%m-%d')
+            return timestamp_str
+
+        # 时间格式
+        if ':' in timestamp_str:
+            return timestamp_str
+
+    except ValueError:
+        pass
+
+    return None
+
+
+class _PreparedText:
+    """processed_text中对话的列式预处理结果
+
+    将对话列表拆成内容/时间戳/说话人三个并行列表，指纹和分词集合按需计算，
+    同一个processed_text的多次增强调用共享一份结果。
+    """
+
+    __slots__ = ('contents', 'timestamps', 'speakers', 'keyword_bits', '_fingerprint', '_token_sets',
+                 '_joined', '_starts', '_ends', '_lengths', '_forward_hits')
+
+    def __init__(self, dialogues: List[Dict]):
+        self.contents: List[str] = [dialogue.get('content', '') for dialogue in dialogues]
+        self.timestamps: List[str] = [dialogue.get('timestamp', '') for dialogue in dialogues]
+        # 说话人标签在对话中大量重复，驻留后共享同一对象
+        self.speakers: List[str] = [_intern(dialogue.get('speaker', '')) for dialogue in dialogues]
+        # 关键词 -> 按位打包的命中位图，第i位表示关键词是否出现在第i条对话中
+        self.keyword_bits: Dict[str, np.ndarray] = {}
+        self._fingerprint: Optional[str] = None
+        self._token_sets: Optional[List[FrozenSet[str]]] = None
+        # 全部内容拼接成的单个字符串及各条对话的起止偏移、长度，按需构建
+        self._joined: Optional[str] = None
+        self._starts: Optional[List[int]] = None
+        self._ends: Optional[List[int]] = None
+        self._lengths: Optional[np.ndarray] = None
+        # 证据内容 -> 包含该内容的对话下标，由 prefetch_exact 批量填充
+        self._forward_hits: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def is_current(self, dialogues: List[Dict]) -> bool:
+        """判断预处理结果是否仍与对话列表一致
+
+        逐条比较内容、时间戳和说话人，就地修改过的对话会被识别出来。
+        未修改时各字段与列中是同一个字符串对象，比较按身份短路，不必逐字符比对。
+        """
+        if len(dialogues) != len(self.contents):
+            return False
+        for dialogue, content, timestamp, speaker in zip(dialogues, self.contents, self.timestamps, self.speakers):
+            if (dialogue.get('content', '') != content
+                    or dialogue.get('timestamp', '') != timestamp
+                    or dialogue.get('speaker', '') != speaker):
+                return False
+        return True
+
+    @property
+    def fingerprint(self) -> str:
+        """覆盖全部对话时间戳和内容的指纹"""
+        if self._fingerprint is None:
+            # 序列化为JSON数组，避免内容中的分隔符造成指纹歧义
+            self._fingerprint = _digest(_json_dumps([self.timestamps, self.contents]))
+        return self._fingerprint
+
+    @property
+    def token_sets(self) -> List[FrozenSet[str]]:
+        """每条对话的分词集合"""
+        if self._token_sets is None:
+            self._token_sets = [frozenset(_tokenize_zh(content)) for content in self.contents]
+        return self._token_sets
+
+    def exact_match_indices(self, content: str) -> List[int]:
+        """查找与证据内容互相包含的对话下标
+
+        等价于逐条判断 ``content in c or c in content``：正向包含优先取 prefetch_exact
+        的批量结果，否则在拼接串上用 str.find 跳跃查找；反向包含只检查长度不超过证据的对话。
+
+        Args:
+            content: 证据内容
+
+        Returns:
+            List[int]: 升序排列的对话下标
+        """
+        contents = self.contents
+        if not content:
+            return list(range(len(contents)))
+
+        self._build_joined()
+        joined, starts, ends = self._joined, self._starts, self._ends
+        size = len(content)
+
+        prefetched = self._forward_hits.get(content)
+        hits = set(prefetched) if prefetched is not None else set()
+        pos = joined.find(content) if prefetched is None else -1
+        while pos >= 0:
+            i = bisect_right(starts, pos) - 1
+            if pos + size <= ends[i]:
+                # 命中后直接跳到下一条对话，每条对话至多命中一次
+                hits.add(i)
+                if i + 1 >= len(starts):
+                    break
+                pos = joined.find(content, starts[i + 1])
+            else:
+                # 跨越了对话边界，继续向后查找
+                pos = joined.find(content, pos + 1)
+
+        for i in np.flatnonzero(self._lengths <= size).tolist():
+            if i not in hits and contents[i] in content:
+                hits.add(i)
+
+        return sorted(hits)
+
+    def prefetch_exact(self, contents: List[str]) -> None:
+        """用一个Aho-Corasick自动机一次扫描拼接串，批量求出多条证据内容的正向包含结果
+
+        结果供 exact_match_indices 直接使用；未安装pyahocorasick时不做任何事。
+
+        Args:
+            contents: 证据内容列表
+        """
+        if ahocorasick is None:
+            return
+        patterns = tuple(sorted({c for c in contents if c and c not in self._forward_hits}))
+        if not patterns:
+            return
+
+        self._build_joined()
+        starts, ends = self._starts, self._ends
+        found: List[set] = [set() for _ in patterns]
+        for end, i in _build_automaton(patterns).iter(self._joined):
+            # end 为匹配末字符的下标，起点落在同一条对话内才算包含
+            dialogue = bisect_right(starts, end) - 1
+            if end < ends[dialogue] and end - len(patterns[i]) + 1 >= starts[dialogue]:
+                found[i].add(dialogue)
+
+        for pattern, dialogues in zip(patterns, found):
+            self._forward_hits[pattern] = sorted(dialogues)
+
+    def _build_joined(self) -> None:
+        """按需构建内容拼接串及各条对话的起止偏移"""
+        if self._joined is not None:
+            return
+        contents = self.contents
+        self._joined = "\x00".join(contents)
+        self._lengths = np.fromiter(map(len, contents), dtype=np.int64, count=len(contents))
+        self._starts, self._ends = [], []
+        start = 0
+        for length in self._lengths.tolist():
+            self._starts.append(start)
+            self._ends.append(start + length)
+            start += length + 1
+
+
+class EvictionPolicy(str, Enum):
+    """证据缓存淘汰策略"""
+    LRU = "lru"            # 纯LRU
+    TINYLFU = "tinylfu"    # LRU淘汰 + TinyLFU准入
+
+
+# 计数器整体减半的查找表（bytes.translate 在C层完成）
+_HALVE_TABLE = bytes(i >> 1 for i in range(256))
+
+
+class _TinyLFU:
+    """TinyLFU准入过滤器
+
+    Count-Min Sketch（4行×2^14个4位饱和计数器）估计键的访问频率，
+    doorkeeper 拦截只出现一次的键；累计采样到 sample_size 次后所有计数减半（老化）。
+    """
+
+    _DEPTH = 4
+    _WIDTH = 1 << 14
+    _MAX_COUNT = 15
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x85EBCA77C2B2AE63)
+
+    __slots__ = ('sample_size', '_rows', '_doorkeeper', '_additions')
+
+    def __init__(self, sample_size: int):
+        self.sample_size = max(sample_size, 1)
+        self._rows = [bytearray(self._WIDTH) for _ in range(self._DEPTH)]
+        self._doorkeeper: set = set()
+        self._additions = 0
+
+    def _indexes(self, key: str) -> List[int]:
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        mask = self._WIDTH - 1
+        return [((h * seed) & 0xFFFFFFFFFFFFFFFF) >> 50 & mask for seed in self._SEEDS]
+
+    def increment(self, key: str) -> None:
+        """记录一次访问"""
+        if key not in self._doorkeeper:
+            self._doorkeeper.add(key)
+        else:
+            for row, i in zip(self._rows, self._indexes(key)):
+                if row[i] < self._MAX_COUNT:
+                    row[i] += 1
+
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        """估计键的访问频率"""
+        count = min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+        return count + (1 if key in self._doorkeeper else 0)
+
+    def admit(self, candidate: str, victim: str) -> bool:
+        """候选键的频率高于淘汰对象时才准入"""
+        return self.estimate(candidate) > self.estimate(victim)
+
+    def _age(self) -> None:
+        for row in self._rows:
+            row[:] = row.translate(_HALVE_TABLE)
+        self._doorkeeper.clear()
+        self._additions = 0
+
 
 class EvidenceEnhancer:
     """证据增强器
@@ -29,27 +392,29 @@ class EvidenceEnhancer:
     }
     """
 
-    def __init__(self, max_quote_length: int = 200, cache_size: int = 1000):
+    def __init__(self,
+                 max_quote_length: int = 200,
+                 cache_size: int = 1000,
+                 cache_policy: Union[str, EvictionPolicy] = EvictionPolicy.LRU,
+                 max_quote_bytes: Optional[int] = None):
         """初始化证据增强器
 
         Args:
             max_quote_length: 引用片段的最大长度
             cache_size: 缓存大小
+            cache_policy: 缓存策略，"lru" 或 "tinylfu"
+            max_quote_bytes: 引用片段的最大UTF-8字节数，设置后按字节预算截断，
+                中文场景可取 max_quote_length * 3
         """
         self.max_quote_length = max_quote_length
+        self.max_quote_bytes = max_quote_bytes
         self.cache_size = cache_size
-        self._cache: Dict[str, List[Dict]] = {}
+        self.cache_policy = EvictionPolicy(cache_policy)
+        self._cache: "OrderedDict[str, List[Dict]]" = OrderedDict()
         self._cache_stats = {"hits": 0, "misses": 0}
-
-        # 常见的证据格式正则模式
-        self._evidence_patterns = [
-            # 格式1: "姓名 日期 内容"
-            r'^(.+?)\s+(\d{4}年\d{1,2}月\d{1,2}日|\d{4}-\d{1,2}-\d{1,2})\s+(.+)$',
-            # 格式2: "时间戳: 内容"
-            r'^(\d{1,2}:\d{1,2}:\d{1,2}|\d{1,2}:\d{1,2})\s*[:：]\s*(.+)$',
-            # 格式3: 纯内容（无时间信息）
-            r'^(.+)$'
-        ]
+        self._admission = self._create_admission_filter()
+        # id(processed_text) -> (processed_text, 预处理结果)
+        self._prepared_cache: "OrderedDict[int, Tuple[Dict, _PreparedText]]" = OrderedDict()
 
     def enhance_evidence(self,
                         evidence_text: str,
@@ -68,16 +433,22 @@ class EvidenceEnhancer:
         if not evidence_text or not evidence_text.strip():
             return []
 
-        # 检查缓存
-        cache_key = self._generate_cache_key(evidence_text, processed_text, context_hint)
-        if cache_key in self._cache:
-            self._cache_stats["hits"] += 1
-            logger.debug(f"Cache hit for evidence: {evidence_text[:50]}...")
-            return self._cache[cache_key]
+        cache_key = None
+        try:
+            # 检查缓存；指纹需要遍历对话，格式异常的processed_text在此处即会抛出
+            cache_key = self._generate_cache_key(evidence_text, processed_text, context_hint)
+            if self._admission is not None:
+                self._admission.increment(cache_key)
 
-        self._cache_stats["misses"] += 1
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                self._cache_stats["hits"] += 1
+                logger.debug(f"Cache hit for evidence: {evidence_text[:50]}...")
+                return cached
+
+            self._cache_stats["misses"] += 1
 
-        try:
             # 解析证据文本
             parsed_evidence = self._parse_evidence_text(evidence_text)
 
@@ -101,9 +472,46 @@ class EvidenceEnhancer:
         except Exception as e:
             logger.warning(f"Evidence enhancement failed: {e}, using fallback")
             fallback_result = self._create_simple_fallback(evidence_text)
-            self._update_cache(cache_key, fallback_result)
+            if cache_key is not None:
+                self._update_cache(cache_key, fallback_result)
             return fallback_result
 
+    def enhance_evidence_batch(self,
+                               evidence_texts: List[str],
+                               processed_text: Optional[Dict] = None,
+                               context_hints: Optional[List[Optional[str]]] = None) -> List[List[Dict[str, Any]]]:
+        """批量增强多条证据文本
+
+        同一份processed_text只预处理一次，所有证据共享对话列和指纹。
+
+        Args:
+            evidence_texts: 原始证据文本列表
+            processed_text: 处理后的文本数据，包含dialogues等信息
+            context_hints: 与证据一一对应的上下文提示列表
+
+        Returns:
+            List[List[Dict]]: 与输入顺序一致的结构化证据列表
+        """
+        if context_hints is None:
+            context_hints = [None] * len(evidence_texts)
+        elif len(context_hints) != len(evidence_texts):
+            raise ValueError("context_hints must align with evidence_texts")
+
+        if processed_text:
+            try:
+                prepared = self._get_or_prepare(processed_text)
+                # 一次多模式扫描求出全部证据的精确匹配，逐条增强时直接复用
+                if prepared:
+                    prepared.prefetch_exact([_evidence_body(text) for text in evidence_texts if text])
+            except Exception as e:
+                # 预取只是优化，失败时交由逐条增强各自降级
+                logger.warning(f"Evidence prefetch failed: {e}")
+
+        return [
+            self.enhance_evidence(evidence_text, processed_text, context_hint)
+            for evidence_text, context_hint in zip(evidence_texts, context_hints)
+        ]
+
     def _parse_evidence_text(self, evidence_text: str) -> Dict[str, Any]:
         """解析证据文本，提取结构化信息
 
@@ -121,21 +529,15 @@ class EvidenceEnhancer:
             "keywords": []
         }
 
-        # 尝试各种格式模式
-        for pattern in self._evidence_patterns:
-            match = re.match(pattern, evidence_text.strip(), re.DOTALL)
-            if match:
-                groups = match.groups()
-
-                if len(groups) == 3:  # 格式1: 姓名 日期 内容
-                    evidence_info["speaker"] = groups[0].strip()
-                    evidence_info["timestamp"] = self._parse_timestamp(groups[1])
-                    evidence_info["content"] = groups[2].strip()
-                elif len(groups) == 2:  # 格式2: 时间: 内容
-                    evidence_info["timestamp"] = groups[0].strip()
-                    evidence_info["content"] = groups[1].strip()
-
-                break
+        match = _EVIDENCE_RE.match(evidence_info["content"])
+        if match:
+            if match.group("date") is not None:  # 格式1: 姓名 日期 内容
+                evidence_info["speaker"] = _intern(match.group("speaker").strip())
+                evidence_info["timestamp"] = self._parse_timestamp(match.group("date"))
+                evidence_info["content"] = match.group("body").strip()
+            else:  # 格式2: 时间: 内容
+                evidence_info["timestamp"] = match.group("time").strip()
+                evidence_info["content"] = match.group("tail").strip()
 
         # 提取关键词用于匹配
         evidence_info["keywords"] = self._extract_keywords(evidence_info["content"])
@@ -156,82 +558,141 @@ class EvidenceEnhancer:
         Returns:
             List[Dict]: 匹配到的对话片段
         """
-        dialogues = processed_text.get('dialogues', [])
-        if not dialogues:
+        prepared = self._get_or_prepare(processed_text)
+        if not prepared:
             return []
 
         matches = []
         content = parsed_evidence["content"]
         keywords = parsed_evidence["keywords"]
+        contents = prepared.contents
 
         # 策略1: 精确文本匹配
-        for i, dialogue in enumerate(dialogues):
-            dialogue_content = dialogue.get('content', '')
-            if content in dialogue_content or dialogue_content in content:
-                matches.append({
-                    "idx": i,
-                    "ts": dialogue.get('timestamp', ''),
-                    "quote": self._truncate_quote(dialogue_content),
-                    "match_type": "exact",
-                    "confidence": 1.0
-                })
+        for i in prepared.exact_match_indices(content):
+            matches.append({
+                "idx": i,
+                "ts": prepared.timestamps[i],
+                "quote": self._truncate_quote(contents[i]),
+                "match_type": MATCH_EXACT,
+                "confidence": 1.0
+            })
 
         # 策略2: 关键词匹配（如果精确匹配失败）
         if not matches and keywords:
-            for i, dialogue in enumerate(dialogues):
-                dialogue_content = dialogue.get('content', '')
-                match_score = self._calculate_keyword_match_score(keywords, dialogue_content)
-
-                if match_score > 0.3:  # 阈值可配置
-                    matches.append({
-                        "idx": i,
-                        "ts": dialogue.get('timestamp', ''),
-                        "quote": self._truncate_quote(dialogue_content),
-                        "match_type": "keyword",
-                        "confidence": match_score
-                    })
+            scores = self._keyword_match_scores(keywords, contents, prepared)
+
+            # 稳定排序保证同分时仍按对话顺序取前N个
+            for i in np.argsort(-scores, kind="stable")[:_MAX_MATCHES]:
+                if scores[i] <= _KEYWORD_THRESHOLD:
+                    break
+                matches.append({
+                    "idx": int(i),
+                    "ts": prepared.timestamps[i],
+                    "quote": self._truncate_quote(contents[i]),
+                    "match_type": MATCH_KEYWORD,
+                    "confidence": float(scores[i])
+                })
 
         # 策略3: 模糊匹配（基于相似度）
         if not matches:
-            matches = self._fuzzy_match_dialogues(content, dialogues)
+            matches = self._fuzzy_match_dialogues(content, processed_text.get('dialogues', []), prepared)
 
         # 排序并返回最佳匹配
         matches.sort(key=lambda x: x["confidence"], reverse=True)
-        return matches[:3]  # 最多返回3个匹配结果
+        return matches[:_MAX_MATCHES]
 
-    def _fuzzy_match_dialogues(self, content: str, dialogues: List[Dict]) -> List[Dict[str, Any]]:
+    def _fuzzy_match_dialogues(self,
+                               content: str,
+                               dialogues: List[Dict],
+                               prepared: Optional[_PreparedText] = None) -> List[Dict[str, Any]]:
         """模糊匹配对话片段
 
         Args:
             content: 证据内容
             dialogues: 对话列表
+            prepared: 对话列表的预处理结果，未提供时现场构建
 
         Returns:
             List[Dict]: 模糊匹配结果
         """
-        matches = []
-        content_words = set(content.replace('，', '').replace('。', '').replace('？', '').split())
+        if prepared is None:
+            prepared = _PreparedText(dialogues)
+        contents = prepared.contents
+        if not contents:
+            return []
 
-        for i, dialogue in enumerate(dialogues):
-            dialogue_content = dialogue.get('content', '')
-            dialogue_words = set(dialogue_content.replace('，', '').replace('。', '').replace('？', '').split())
+        # 第一阶段：用分词集合的交集做稀疏召回，只对候选对话计算相似度
+        sparse_scores = self._sparse_match_scores(content, prepared)
+        candidate_idxs = [i for i, score in enumerate(sparse_scores) if score > 0]
+
+        if len(candidate_idxs) < _MIN_FUZZY_CANDIDATES:
+            # 候选不足时补充与证据共享任一双字片段的对话
+            bigrams = list(dict.fromkeys(content[i:i + 2] for i in range(len(content) - 1)))
+            if bigrams:
+                shared = self._keyword_hit_matrix(bigrams, contents).any(axis=0)
+                candidate_idxs = np.flatnonzero(shared | (sparse_scores > 0)).tolist()
+
+        if not candidate_idxs:
+            # 稀疏召回为空时退回全量比对，保证召回率
+            candidate_idxs = list(range(len(contents)))
+
+        # 第二阶段：对候选对话计算模糊相似度
+        candidate_contents = [contents[i] for i in candidate_idxs]
+        if process is not None:
+            # RapidFuzz在C++层批量计算相似度，并按阈值提前剪枝
+            scored = process.extract(
+                content,
+                candidate_contents,
+                scorer=fuzz.token_set_ratio,
+                score_cutoff=_FUZZY_THRESHOLD * 100,
+                limit=None
+            )
+            fuzzy_scores = [(candidate_idxs[j], score / 100.0) for _, score, j in scored]
+        else:
+            fuzzy_scores = []
+            for i, dialogue_content in zip(candidate_idxs, candidate_contents):
+                similarity = difflib.SequenceMatcher(None, content, dialogue_content).ratio()
+                if similarity >= _FUZZY_THRESHOLD:
+                    fuzzy_scores.append((i, similarity))
+
+        candidates = sorted(
+            ((i, _SPARSE_WEIGHT * float(sparse_scores[i]) + _FUZZY_WEIGHT * similarity)
+             for i, similarity in fuzzy_scores),
+            key=lambda x: x[1],
+            reverse=True
+        )[:_MAX_MATCHES]
+
+        return [
+            {
+                "idx": i,
+                "ts": prepared.timestamps[i],
+                "quote": self._truncate_quote(contents[i]),
+                "match_type": MATCH_FUZZY,
+                "confidence": confidence
+            }
+            for i, confidence in candidates
+        ]
 
-            # 计算词汇重叠度
-            if content_words and dialogue_words:
-                overlap = len(content_words & dialogue_words)
-                union = len(content_words | dialogue_words)
-                similarity = overlap / union if union > 0 else 0
+    def _sparse_match_scores(self, content: str, prepared: _PreparedText) -> np.ndarray:
+        """计算证据分词与每条对话分词集合的重合比例
 
-                if similarity > 0.2:  # 相似度阈值
-                    matches.append({
-                        "idx": i,
-                        "ts": dialogue.get('timestamp', ''),
-                        "quote": self._truncate_quote(dialogue_content),
-                        "match_type": "fuzzy",
-                        "confidence": similarity
-                    })
+        Args:
+            content: 证据内容
+            prepared: 对话列表的预处理结果
 
-        return matches
+        Returns:
+            np.ndarray: 每条对话的稀疏匹配分数 (0-1)，证据无有效分词时全为0
+        """
+        query_tokens = frozenset(word for word in _tokenize_zh(content) if _is_keyword_token(word))
+        if not query_tokens:
+            return np.zeros(len(prepared), dtype=np.float64)
+
+        overlap = np.fromiter(
+            (len(query_tokens & tokens) for tokens in prepared.token_sets),
+            dtype=np.float64,
+            count=len(prepared)
+        )
+        return overlap / len(query_tokens)
 
     def _create_fallback_evidence(self, parsed_evidence: Dict[str, Any], original_text: str) -> List[Dict[str, Any]]:
         """创建降级证据格式
@@ -249,7 +710,7 @@ class EvidenceEnhancer:
             "idx": 0,
             "ts": parsed_evidence.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
             "quote": self._truncate_quote(parsed_evidence["content"]),
-            "match_type": "fallback",
+            "match_type": MATCH_FALLBACK,
             "confidence": 0.5,
             "original_evidence": original_text
         }]
@@ -267,7 +728,7 @@ class EvidenceEnhancer:
             "idx": 0,
             "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "quote": self._truncate_quote(evidence_text),
-            "match_type": "simple_fallback",
+            "match_type": MATCH_SIMPLE,
             "confidence": 0.1
         }]
 
@@ -280,25 +741,9 @@ class EvidenceEnhancer:
         Returns:
             str: 标准化的时间戳
         """
-        try:
-            # 尝试解析中文日期格式
-            if '年' in timestamp_str and '月' in timestamp_str and '日' in timestamp_str:
-                # 转换为标准格式
-                timestamp_str = timestamp_str.replace('年', '-').replace('月', '-').replace('日', '')
-                datetime.strptime(timestamp_str, '%Y-%m-%d')
-                return timestamp_str
-
-            # 尝试解析ISO格式
-            if '-' in timestamp_str:
-                datetime.strptime(timestamp_str, '%Y-%m-%d')
-                return timestamp_str
-
-            # 时间格式
-            if ':' in timestamp_str:
-                return timestamp_str
-
-        except ValueError:
-            pass
+        normalized = _normalize_timestamp(timestamp_str)
+        if normalized is not None:
+            return normalized
 
         # 如果解析失败，返回当前时间
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -312,13 +757,8 @@ class EvidenceEnhancer:
         Returns:
             List[str]: 关键词列表
         """
-        # 移除标点符号，分割为词汇
-        import re
-        words = re.findall(r'[\u4e00-\u9fff]+|[a-zA-Z]+', content)
-
-        # 过滤短词和停用词
-        stop_words = {'的', '了', '在', '是', '我', '你', '他', '她', '它', '我们', '你们', '他们'}
-        keywords = [word for word in words if len(word) > 1 and word not in stop_words]
+        # 分词后过滤标点、数字、短词和停用词
+        keywords = [word for word in _tokenize_zh(content) if _is_keyword_token(word)]
 
         return keywords[:10]  # 最多返回10个关键词
 
@@ -335,9 +775,122 @@ class EvidenceEnhancer:
         if not keywords:
             return 0.0
 
-        matched_count = sum(1 for keyword in keywords if keyword in content)
+        # map + __contains__ 让整个循环停留在C层，避免生成器逐个产出
+        matched_count = sum(map(content.__contains__, keywords))
         return matched_count / len(keywords)
 
+    def _keyword_match_scores(self,
+                              keywords: List[str],
+                              contents: List[str],
+                              prepared: Optional[_PreparedText] = None) -> np.ndarray:
+        """批量计算所有对话的关键词匹配分数
+
+        与逐条调用 _calculate_keyword_match_score 的结果一致。提供预处理结果时，
+        每个关键词的命中位图只计算一次，后续调用直接复用。
+
+        Args:
+            keywords: 关键词列表
+            contents: 对话内容列表
+            prepared: 对话列表的预处理结果
+
+        Returns:
+            np.ndarray: 每条对话的匹配分数 (0-1)
+        """
+        if not keywords:
+            return np.zeros(len(contents), dtype=np.float64)
+
+        if prepared is None:
+            hits = self._keyword_hit_matrix(keywords, contents)
+        else:
+            bits = prepared.keyword_bits
+            missing = [keyword for keyword in dict.fromkeys(keywords) if keyword not in bits]
+            if missing:
+                packed = np.packbits(self._keyword_hit_matrix(missing, contents), axis=1)
+                bits.update(zip(missing, packed))
+            hits = np.unpackbits(
+                np.stack([bits[keyword] for keyword in keywords]),
+                axis=1,
+                count=len(contents)
+            )
+
+        return hits.mean(axis=0)
+
+    def _keyword_hit_matrix(self, keywords: List[str], contents: List[str]) -> np.ndarray:
+        """计算关键词×对话的子串命中矩阵
+
+        Args:
+            keywords: 关键词列表
+            contents: 对话内容列表
+
+        Returns:
+            np.ndarray: 形状为 (关键词数, 对话数) 的布尔矩阵
+        """
+        if ahocorasick is not None:
+            return self._automaton_hit_matrix(keywords, contents)
+
+        if process is None:
+            return np.array(
+                [[keyword in content for content in contents] for keyword in keywords],
+                dtype=bool
+            ).reshape(len(keywords), len(contents))
+
+        matrix = self._score_matrix(keywords, contents)
+
+        # partial_ratio为100且关键词不长于对话时，等价于关键词是对话的子串
+        keyword_lengths = np.fromiter(map(len, keywords), dtype=np.int64, count=len(keywords))
+        content_lengths = np.fromiter(map(len, contents), dtype=np.int64, count=len(contents))
+        return (matrix == 100) & (keyword_lengths[:, None] <= content_lengths[None, :])
+
+    def _automaton_hit_matrix(self, keywords: List[str], contents: List[str]) -> np.ndarray:
+        """用Aho-Corasick自动机一次扫描每条对话，得到关键词命中矩阵
+
+        Args:
+            keywords: 关键词列表
+            contents: 对话内容列表
+
+        Returns:
+            np.ndarray: 形状为 (关键词数, 对话数) 的布尔矩阵
+        """
+        hits = np.zeros((len(keywords), len(contents)), dtype=bool)
+
+        # 重复关键词共用一个模式；空串是任何内容的子串，直接全部命中
+        rows: Dict[str, List[int]] = {}
+        for row, keyword in enumerate(keywords):
+            if keyword:
+                rows.setdefault(keyword, []).append(row)
+            else:
+                hits[row] = True
+        if not rows:
+            return hits
+
+        patterns = tuple(rows)
+        automaton = _build_automaton(patterns)
+        for col, content in enumerate(contents):
+            found = {i for _, i in automaton.iter(content)}
+            for i in found:
+                hits[rows[patterns[i]], col] = True
+
+        return hits
+
+    def _score_matrix(self, keywords: List[str], contents: List[str]) -> np.ndarray:
+        """计算关键词×对话的partial_ratio分数矩阵
+
+        Args:
+            keywords: 关键词列表
+            contents: 对话内容列表
+
+        Returns:
+            np.ndarray: 形状为 (关键词数, 对话数) 的uint8矩阵，未完全命中的位置为0
+        """
+        return process.cdist(
+            keywords,
+            contents,
+            scorer=fuzz.partial_ratio,
+            score_cutoff=100,
+            dtype=np.uint8,
+            workers=-1
+        )
+
     def _truncate_quote(self, quote: str) -> str:
         """截断引用片段到合适长度
 
@@ -347,17 +900,52 @@ class EvidenceEnhancer:
         Returns:
             str: 截断后的引用
         """
-        if len(quote) <= self.max_quote_length:
+        if not quote:
+            return ""
+
+        if self.max_quote_bytes is not None:
+            return self._truncate_quote_bytes(quote)
+
+        limit = self.max_quote_length
+        if len(quote) <= limit:
             return quote
 
-        # 尽量在句子边界截断
-        truncated = quote[:self.max_quote_length]
-        sentence_end = max(truncated.rfind('。'), truncated.rfind('！'), truncated.rfind('？'))
+        # 尽量在句子边界截断，直接在原串的前limit个字符内反向查找，不复制中间串
+        sentence_end = max(quote.rfind(mark, 0, limit) for mark in _SENTENCE_ENDS)
 
-        if sentence_end > self.max_quote_length * 0.5:  # 如果句子结束位置合理
+        if sentence_end > limit * 0.5:  # 如果句子结束位置合理
             return quote[:sentence_end + 1]
         else:
-            return truncated + "..."
+            return quote[:limit] + "..."
+
+    def _truncate_quote_bytes(self, quote: str) -> str:
+        """按UTF-8字节预算截断引用片段
+
+        规则与按字符截断一致，句子边界在编码后的字节串上用 bytes.rfind 查找；
+        不在边界处截断时丢弃被切开的不完整字符。
+
+        Args:
+            quote: 原始引用
+
+        Returns:
+            str: 截断后的引用
+        """
+        data = quote.encode('utf-8')
+        limit = self.max_quote_bytes
+        if len(data) <= limit:
+            return quote
+
+        # 句子结束符须完整落在字节预算内，sentence_end 为结束符之后的位置
+        sentence_end = -1
+        for mark in _SENTENCE_END_BYTES:
+            pos = data.rfind(mark, 0, limit)
+            if pos >= 0:
+                sentence_end = max(sentence_end, pos + len(mark))
+
+        if sentence_end > limit * 0.5:
+            return data[:sentence_end].decode('utf-8')
+        else:
+            return data[:limit].decode('utf-8', 'ignore') + "..."
 
     def _generate_cache_key(self, evidence_text: str, processed_text: Optional[Dict], context_hint: Optional[str]) -> str:
         """生成缓存键
@@ -370,8 +958,37 @@ class EvidenceEnhancer:
         Returns:
             str: 缓存键
         """
-        key_data = f"{evidence_text}|{str(processed_text)}|{context_hint or ''}"
-        return hashlib.md5(key_data.encode('utf-8')).hexdigest()[:16]
+        fingerprint = self._get_or_prepare(processed_text).fingerprint if processed_text else "none"
+        evidence_hash = _digest(evidence_text.encode('utf-8'))
+        return f"{fingerprint}:{evidence_hash}:{context_hint or ''}"
+
+    def _get_or_prepare(self, processed_text: Dict) -> _PreparedText:
+        """获取processed_text的预处理结果
+
+        按对象身份缓存，同一个processed_text重复调用时无需再次拆列和序列化对话。
+        缓存条目持有对象引用，避免对象回收后id被复用造成误命中；
+        命中前逐条核对对话字段，对话被增删或就地修改时重新构建。
+
+        Args:
+            processed_text: 处理文本
+
+        Returns:
+            _PreparedText: 预处理结果
+        """
+        dialogues = processed_text.get('dialogues') or []
+        key = id(processed_text)
+        entry = self._prepared_cache.get(key)
+        if entry is not None and entry[0] is processed_text and entry[1].is_current(dialogues):
+            self._prepared_cache.move_to_end(key)
+            return entry[1]
+
+        prepared = _PreparedText(dialogues)
+        self._prepared_cache[key] = (processed_text, prepared)
+        self._prepared_cache.move_to_end(key)
+        while len(self._prepared_cache) > _PREPARED_CACHE_SIZE:
+            self._prepared_cache.popitem(last=False)
+
+        return prepared
 
     def _update_cache(self, key: str, value: List[Dict[str, Any]]) -> None:
         """更新缓存
@@ -380,14 +997,24 @@ class EvidenceEnhancer:
             key: 缓存键
             value: 缓存值
         """
-        # 如果缓存超限，删除一些旧条目（简单LRU）
-        if len(self._cache) >= self.cache_size:
-            # 删除前10%的条目
-            keys_to_remove = list(self._cache.keys())[:self.cache_size // 10]
-            for k in keys_to_remove:
-                del self._cache[k]
-
+        # TinyLFU：缓存已满时，新条目频率不高于LRU淘汰对象则不缓存
+        if (self._admission is not None and key not in self._cache
+                and self._cache and len(self._cache) >= self.cache_size):
+            victim = next(iter(self._cache))
+            if not self._admission.admit(key, victim):
+                return
+
+        # LRU：新条目放到末尾，超限时淘汰最久未使用的条目
         self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _create_admission_filter(self) -> Optional[_TinyLFU]:
+        """按缓存策略创建准入过滤器，采样窗口为缓存容量的10倍"""
+        if self.cache_policy is EvictionPolicy.TINYLFU:
+            return _TinyLFU(sample_size=self.cache_size * 10)
+        return None
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息
@@ -411,4 +1038,6 @@ class EvidenceEnhancer:
         """清空缓存"""
         self._cache.clear()
         self._cache_stats = {"hits": 0, "misses": 0}
+        self._admission = self._create_admission_filter()
+        self._prepared_cache.clear()
         logger.info("Evidence enhancer cache cleared")
\ No newline at end of file
@@ -10,12 +10,22 @@ UI界面所需的标准化格式。采用适配器模式，确保零侵入现有
 4. 性能优化：缓存机制和懒加载处理
 """
 
+import copy
+import functools
 import logging
-from typing import Dict, List, Optional, Any, Union
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime
+import hashlib
 import json
 
-from .evidence_enhancer import EvidenceEnhancer
+try:
+    import xxhash
+except ImportError:  # xxhash为可选依赖，缺失时使用blake2b
+    xxhash = None
+
+from .evidence_enhancer import EvidenceEnhancer, MATCH_FALLBACK, _PreparedText
 from ..models.schemas import (
     CallAnalysisResult, EvidenceHit, IcebreakModel, DeductionModel,
     ProcessModel, CustomerModel, ActionsModel, ActionExecution
@@ -23,6 +33,119 @@ from ..models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+_ADAPTER_VERSION = "1.0.0"
+
+# 动作模型中的全部动作字段（按定义顺序）及其中文名称
+_ACTION_FIELDS = tuple(
+    name for name, field in ActionsModel.model_fields.items()
+    if field.annotation is ActionExecution
+)
+_ACTIONS_GETTER = attrgetter(*_ACTION_FIELDS)
+
+_CN_ACTION_NAMES = MappingProxyType({
+    "professional_identity": "专业身份",
+    "value_help": "帮助价值",
+    "time_notice": "时间说明",
+    "company_background": "公司背景",
+    "free_teach": "免费讲解",
+    "bs_explained": "BS点讲解",
+    "period_resonance_explained": "周期共振",
+    "control_funds_explained": "控盘资金",
+    "bubugao_explained": "步步高",
+    "value_quantify_explained": "价值量化",
+    "customer_stock_explained": "客户股票"
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _executed_action_names(executed_mask: int) -> Tuple[str, ...]:
+    """按位掩码查出已执行动作的中文名称，最多 2^len(_ACTION_FIELDS) 种组合
+
+    Args:
+        executed_mask: 已执行动作位掩码，第i位对应 _ACTION_FIELDS[i]
+
+    Returns:
+        Tuple[str, ...]: 按字段定义顺序排列的中文名称
+    """
+    return tuple(
+        _CN_ACTION_NAMES.get(field_name, field_name)
+        for bit, field_name in enumerate(_ACTION_FIELDS)
+        if executed_mask >> bit & 1
+    )
+
+
+# 证据字段映射表：(UI字段名, 模型属性名, 上下文提示, 深度分析话题)
+# 深度分析话题为None时只输出证据，否则输出 coverage + depth_effectiveness
+_OPENING_FIELDS = (
+    ("professional_identity", "professional_identity", "专业身份", None),
+    ("value_help", "value_help", "帮助价值", None),
+    ("time_notice", "time_notice", "时间说明", None),
+    ("tencent_invest", "company_background", "腾讯投资", None),
+    ("free_teach", "free_teach", "免费讲解", None),
+)
+
+_DEMO_FIELDS = (
+    ("bs_explained", "bs_explained", "BS点讲解", None),
+    ("period_resonance_explained", "period_resonance_explained", "周期共振", None),
+    ("control_funds_explained", "control_funds_explained", "控盘资金", None),
+    ("bubugao_explained", "bubugao_explained", "步步高", None),
+    ("value_quantify_explained", "value_quantify_explained", "价值量化", None),
+    ("customer_stock_explained", "customer_stock_explained", "客户股票", None),
+)
+
+_DEMO_MORE_FIELDS = (
+    ("bs_explained", "bs_explained", "BS点覆盖", "BS点讲解"),
+    ("period_resonance_explained", "period_resonance_explained", "周期共振覆盖", "周期共振讲解"),
+    ("control_funds_explained", "control_funds_explained", "控盘资金覆盖", "控盘资金讲解"),
+    ("bubugao_explained", "bubugao_explained", "步步高覆盖", "步步高讲解"),
+    ("value_quantify_explained", "value_quantify_explained", "价值量化覆盖", "价值量化讲解"),
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _depth_effectiveness(length_bucket: int, confidence: float, topic: str, hit: bool = True) -> Dict[str, Any]:
+    """根据证据长度区间和置信度推断讲解深度，结果按参数缓存
+
+    调用方需复制返回的字典后再交给外部，避免缓存内容被修改。
+
+    Args:
+        length_bucket: 证据长度区间（0: ≤50, 1: 51-100, 2: >100）
+        confidence: 置信度
+        topic: 话题名称
+        hit: 是否命中
+
+    Returns:
+        Dict: 深度有效性分析
+    """
+    if not hit:
+        return {
+            "depth": "无",
+            "effectiveness_score": 0,
+            "analysis": f"未检测到{topic}相关内容"
+        }
+
+    if length_bucket == 2 and confidence > 0.8:
+        depth = "深入"
+        effectiveness = 0.8 + confidence * 0.2
+    elif length_bucket >= 1 and confidence > 0.6:
+        depth = "适中"
+        effectiveness = 0.5 + confidence * 0.3
+    else:
+        depth = "浅显"
+        effectiveness = confidence * 0.5
+
+    return {
+        "depth": depth,
+        "effectiveness_score": round(min(effectiveness, 1.0), 2),
+        "analysis": f"{topic}讲解深度{depth}，有效性评分{round(effectiveness, 2)}"
+    }
+
+
+# 批量增强时按字段表顺序一次取出模型上的全部证据对象
+_OPENING_GETTER = attrgetter(*(attr for _, attr, _, _ in _OPENING_FIELDS))
+_DEMO_GETTER = attrgetter(*(attr for _, attr, _, _ in _DEMO_FIELDS))
+_DEMO_MORE_GETTER = attrgetter(*(attr for _, attr, _, _ in _DEMO_MORE_FIELDS))
+
 
 class UIAdapter:
     """UI格式适配器
@@ -46,10 +169,15 @@ class UIAdapter:
         self.enable_cache = enable_cache
         self.cache_size = cache_size
 
-        # 简单的内存缓存
-        self._cache: Dict[str, Dict] = {} if enable_cache else {}
+        # 简单的内存缓存：缓存键 -> (processed_text, 对话快照, UI结果)
+        # 条目持有processed_text引用，命中时校验对象身份，避免id被复用造成误命中；
+        # 对话快照用于识别就地修改过的对话
+        self._cache: Dict[Tuple, Tuple[Optional[Dict], _PreparedText, Dict]] = {}
         self._cache_stats = {"hits": 0, "misses": 0}
 
+        # 降级结果模板，与单次调用无关的部分只构建一次
+        self._fallback_template = self._build_fallback_template()
+
     def convert_to_ui_format(self,
                            result: CallAnalysisResult,
                            processed_text: Optional[Dict] = None,
@@ -71,25 +199,29 @@ class UIAdapter:
             cache_key = self._generate_cache_key(result, processed_text) if self.enable_cache else None
 
             # 检查缓存
-            if cache_key and cache_key in self._cache:
+            entry = self._cache.get(cache_key) if cache_key else None
+            if entry is not None and self._is_cache_entry_current(entry, processed_text):
                 self._cache_stats["hits"] += 1
                 logger.debug(f"Cache hit for call: {result.call_id}")
-                return self._cache[cache_key]
+                return entry[2]
 
             if self.enable_cache:
                 self._cache_stats["misses"] += 1
 
+            # 一次性批量增强所有证据字段
+            enhanced = self._enhance_evidence_fields(result, processed_text)
+
             # 执行转换
             ui_result = {
                 "output": {
                     "customer_side": self._map_customer_side(result.customer),
                     "standard_actions": self._map_standard_actions(result.actions, result.process),
-                    "opening": self._map_opening(result.icebreak, processed_text),
+                    "opening": self._map_opening(result.icebreak, processed_text, enhanced.get("opening")),
                     "meta": self._map_meta(result) if include_metadata else {},
                     "metrics": self._map_metrics(result.process),
                     "rejects": self._map_rejects(result.icebreak),
-                    "demo": self._map_demo(result.演绎, processed_text),
-                    "demo_more": self._map_demo_more(result.演绎, processed_text)
+                    "demo": self._map_demo(result.演绎, processed_text, enhanced.get("demo")),
+                    "demo_more": self._map_demo_more(result.演绎, processed_text, enhanced.get("demo_more"))
                 }
             }
 
@@ -97,14 +229,15 @@ class UIAdapter:
             if include_metadata:
                 ui_result["_adapter_metadata"] = {
                     "conversion_timestamp": datetime.now().isoformat(),
-                    "adapter_version": "1.0.0",
+                    "adapter_version": _ADAPTER_VERSION,
                     "source_call_id": result.call_id,
                     "has_processed_text": processed_text is not None
                 }
 
-            # 缓存结果
-            if cache_key:
-                self._update_cache(cache_key, ui_result)
+            # 缓存结果；processed_text格式异常时无法建立对话快照，不缓存
+            snapshot = self._snapshot_dialogues(processed_text) if cache_key else None
+            if snapshot is not None:
+                self._update_cache(cache_key, (processed_text, snapshot, ui_result))
 
             logger.info(f"Successfully converted call {result.call_id} to UI format")
             return ui_result
@@ -143,6 +276,8 @@ class UIAdapter:
         Returns:
             Dict: 标准动作UI格式
         """
+        executed_count, execution_rate, key_actions = self._summarize_actions(actions)
+
         return {
             "money_ask": {
                 "count": process.money_ask_count,
@@ -150,13 +285,16 @@ class UIAdapter:
                 "total_attempts": process.money_ask_count
             },
             "action_summary": {
-                "total_executed": self._count_executed_actions(actions),
-                "execution_rate": self._calculate_execution_rate(actions),
-                "key_actions": self._get_key_executed_actions(actions)
+                "total_executed": executed_count,
+                "execution_rate": execution_rate,
+                "key_actions": key_actions
             }
         }
 
-    def _map_opening(self, icebreak: IcebreakModel, processed_text: Optional[Dict] = None) -> Dict[str, Any]:
+    def _map_opening(self,
+                     icebreak: IcebreakModel,
+                     processed_text: Optional[Dict] = None,
+                     enhanced: Optional[List[List[Dict]]] = None) -> Dict[str, Any]:
         """映射开场白数据
 
         将IcebreakModel转换为UI格式，使用证据增强器处理证据
@@ -164,27 +302,12 @@ class UIAdapter:
         Args:
             icebreak: 破冰模型
             processed_text: 处理文本
+            enhanced: 与字段一一对应的预先增强证据，缺省时逐字段增强
 
         Returns:
             Dict: 开场白UI格式
         """
-        return {
-            "professional_identity": self._convert_evidence_hit(
-                icebreak.professional_identity, processed_text, "专业身份"
-            ),
-            "value_help": self._convert_evidence_hit(
-                icebreak.value_help, processed_text, "帮助价值"
-            ),
-            "time_notice": self._convert_evidence_hit(
-                icebreak.time_notice, processed_text, "时间说明"
-            ),
-            "tencent_invest": self._convert_evidence_hit(
-                icebreak.company_background, processed_text, "腾讯投资"
-            ),
-            "free_teach": self._convert_evidence_hit(
-                icebreak.free_teach, processed_text, "免费讲解"
-            )
-        }
+        return self._map_evidence_fields(icebreak, _OPENING_FIELDS, processed_text, enhanced)
 
     def _map_meta(self, result: CallAnalysisResult) -> Dict[str, Any]:
         """映射元数据
@@ -246,7 +369,10 @@ class UIAdapter:
             "handling_kpi": icebreak.handling_kpi or {}
         }
 
-    def _map_demo(self, deduction: DeductionModel, processed_text: Optional[Dict] = None) -> Dict[str, Any]:
+    def _map_demo(self,
+                  deduction: DeductionModel,
+                  processed_text: Optional[Dict] = None,
+                  enhanced: Optional[List[List[Dict]]] = None) -> Dict[str, Any]:
         """映射演绎数据
 
         将DeductionModel转换为UI格式，重点处理证据增强
@@ -254,32 +380,17 @@ class UIAdapter:
         Args:
             deduction: 演绎模型
             processed_text: 处理文本
+            enhanced: 与字段一一对应的预先增强证据，缺省时逐字段增强
 
         Returns:
             Dict: 演绎UI格式
         """
-        return {
-            "bs_explained": self._convert_evidence_hit(
-                deduction.bs_explained, processed_text, "BS点讲解"
-            ),
-            "period_resonance_explained": self._convert_evidence_hit(
-                deduction.period_resonance_explained, processed_text, "周期共振"
-            ),
-            "control_funds_explained": self._convert_evidence_hit(
-                deduction.control_funds_explained, processed_text, "控盘资金"
-            ),
-            "bubugao_explained": self._convert_evidence_hit(
-                deduction.bubugao_explained, processed_text, "步步高"
-            ),
-            "value_quantify_explained": self._convert_evidence_hit(
-                deduction.value_quantify_explained, processed_text, "价值量化"
-            ),
-            "customer_stock_explained": self._convert_evidence_hit(
-                deduction.customer_stock_explained, processed_text, "客户股票"
-            )
-        }
+        return self._map_evidence_fields(deduction, _DEMO_FIELDS, processed_text, enhanced)
 
-    def _map_demo_more(self, deduction: DeductionModel, processed_text: Optional[Dict] = None) -> Dict[str, Any]:
+    def _map_demo_more(self,
+                       deduction: DeductionModel,
+                       processed_text: Optional[Dict] = None,
+                       enhanced: Optional[List[List[Dict]]] = None) -> Dict[str, Any]:
         """映射深度演绎数据
 
         基于现有DeductionModel推断深度分析，这是一个增强功能
@@ -287,57 +398,49 @@ class UIAdapter:
         Args:
             deduction: 演绎模型
             processed_text: 处理文本
+            enhanced: 与字段一一对应的预先增强证据，缺省时逐字段增强
 
         Returns:
             Dict: 深度演绎UI格式
         """
-        return {
-            "bs_explained": {
-                "coverage": self._convert_evidence_hit(
-                    deduction.bs_explained, processed_text, "BS点覆盖"
-                ),
-                "depth_effectiveness": self._analyze_depth_effectiveness(
-                    deduction.bs_explained, "BS点讲解"
-                )
-            },
-            "period_resonance_explained": {
-                "coverage": self._convert_evidence_hit(
-                    deduction.period_resonance_explained, processed_text, "周期共振覆盖"
-                ),
-                "depth_effectiveness": self._analyze_depth_effectiveness(
-                    deduction.period_resonance_explained, "周期共振讲解"
-                )
-            },
-            "control_funds_explained": {
-                "coverage": self._convert_evidence_hit(
-                    deduction.control_funds_explained, processed_text, "控盘资金覆盖"
-                ),
-                "depth_effectiveness": self._analyze_depth_effectiveness(
-                    deduction.control_funds_explained, "控盘资金讲解"
-                )
-            },
-            "bubugao_explained": {
-                "coverage": self._convert_evidence_hit(
-                    deduction.bubugao_explained, processed_text, "步步高覆盖"
-                ),
-                "depth_effectiveness": self._analyze_depth_effectiveness(
-                    deduction.bubugao_explained, "步步高讲解"
-                )
-            },
-            "value_quantify_explained": {
-                "coverage": self._convert_evidence_hit(
-                    deduction.value_quantify_explained, processed_text, "价值量化覆盖"
-                ),
-                "depth_effectiveness": self._analyze_depth_effectiveness(
-                    deduction.value_quantify_explained, "价值量化讲解"
-                )
-            }
-        }
+        return self._map_evidence_fields(deduction, _DEMO_MORE_FIELDS, processed_text, enhanced)
+
+    def _map_evidence_fields(self,
+                             model: Union[IcebreakModel, DeductionModel],
+                             fields: tuple,
+                             processed_text: Optional[Dict] = None,
+                             enhanced: Optional[List[List[Dict]]] = None) -> Dict[str, Any]:
+        """按字段映射表将模型中的证据字段转换为UI格式
+
+        Args:
+            model: 破冰或演绎模型
+            fields: 字段映射表，见 _OPENING_FIELDS 等
+            processed_text: 处理文本
+            enhanced: 与字段一一对应的预先增强证据，缺省时逐字段增强
+
+        Returns:
+            Dict: UI字段名到证据（或 coverage + depth_effectiveness）的映射
+        """
+        if enhanced is None:
+            enhanced = (None,) * len(fields)
+        result = {}
+        for (ui_key, attr, hint, topic), pre_enhanced in zip(fields, enhanced):
+            evidence_hit = getattr(model, attr)
+            evidence = self._convert_evidence_hit(evidence_hit, processed_text, hint, pre_enhanced)
+            if topic is None:
+                result[ui_key] = evidence
+            else:
+                result[ui_key] = {
+                    "coverage": evidence,
+                    "depth_effectiveness": self._analyze_depth_effectiveness(evidence_hit, topic)
+                }
+        return result
 
     def _convert_evidence_hit(self,
                             evidence_hit: EvidenceHit,
                             processed_text: Optional[Dict] = None,
-                            context_hint: Optional[str] = None) -> Dict[str, Any]:
+                            context_hint: Optional[str] = None,
+                            enhanced: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """转换证据命中为UI格式
 
         这是核心的证据转换方法，结合EvidenceEnhancer进行增强
@@ -346,17 +449,20 @@ class UIAdapter:
             evidence_hit: 证据命中对象
             processed_text: 处理文本
             context_hint: 上下文提示
+            enhanced: 已批量增强的证据，提供时不再调用证据增强器
 
         Returns:
             Dict: UI格式的证据
         """
         try:
             # 使用证据增强器增强证据
-            enhanced_evidence = self.evidence_enhancer.enhance_evidence(
-                evidence_hit.evidence,
-                processed_text,
-                context_hint
-            )
+            enhanced_evidence = enhanced
+            if enhanced_evidence is None:
+                enhanced_evidence = self.evidence_enhancer.enhance_evidence(
+                    evidence_hit.evidence,
+                    processed_text,
+                    context_hint
+                )
 
             return {
                 "hit": evidence_hit.hit,
@@ -376,13 +482,56 @@ class UIAdapter:
                     "idx": 0,
                     "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     "quote": evidence_hit.evidence[:200] if evidence_hit.evidence else "",
-                    "match_type": "fallback",
+                    "match_type": MATCH_FALLBACK,
                     "confidence": 0.1
                 }],
                 "confidence": evidence_hit.confidence,
                 "evidence_source": "fallback"
             }
 
+    def _enhance_evidence_fields(self,
+                                 result: CallAnalysisResult,
+                                 processed_text: Optional[Dict] = None) -> Dict[str, List[List[Dict]]]:
+        """一次批量调用增强开场白、演绎和深度演绎的全部证据字段
+
+        Args:
+            result: 分析结果
+            processed_text: 处理文本
+
+        Returns:
+            Dict: 分区名 -> 与该分区字段表对齐的增强结果；批量失败时返回空字典，
+                由各字段回退到逐个增强
+        """
+        sections = (
+            ("opening", _OPENING_GETTER(result.icebreak), _OPENING_FIELDS),
+            ("demo", _DEMO_GETTER(result.演绎), _DEMO_FIELDS),
+            ("demo_more", _DEMO_MORE_GETTER(result.演绎), _DEMO_MORE_FIELDS),
+        )
+
+        evidence_texts = []
+        context_hints = []
+        for _, hits, fields in sections:
+            for hit, (_, _, hint, _) in zip(hits, fields):
+                evidence_texts.append(hit.evidence)
+                context_hints.append(hint)
+
+        try:
+            batch = self.evidence_enhancer.enhance_evidence_batch(
+                evidence_texts, processed_text, context_hints
+            )
+            if len(batch) != len(evidence_texts):
+                raise ValueError(f"expected {len(evidence_texts)} results, got {len(batch)}")
+        except Exception as e:
+            logger.warning(f"Batch evidence enhancement failed, converting per field: {e}")
+            return {}
+
+        enhanced = {}
+        offset = 0
+        for name, _, fields in sections:
+            enhanced[name] = batch[offset:offset + len(fields)]
+            offset += len(fields)
+        return enhanced
+
     def _analyze_depth_effectiveness(self, evidence_hit: EvidenceHit, topic: str) -> Dict[str, Any]:
         """分析深度有效性
 
@@ -396,31 +545,35 @@ class UIAdapter:
             Dict: 深度有效性分析
         """
         if not evidence_hit.hit:
-            return {
-                "depth": "无",
-                "effectiveness_score": 0,
-                "analysis": f"未检测到{topic}相关内容"
-            }
+            return dict(_depth_effectiveness(0, 0.0, topic, hit=False))
 
-        # 基于证据长度和置信度推断深度
+        # 深度只取决于证据长度落在哪个区间，按区间而非原始长度缓存以提高命中率
         evidence_length = len(evidence_hit.evidence) if evidence_hit.evidence else 0
-        confidence = evidence_hit.confidence
-
-        if evidence_length > 100 and confidence > 0.8:
-            depth = "深入"
-            effectiveness = 0.8 + confidence * 0.2
-        elif evidence_length > 50 and confidence > 0.6:
-            depth = "适中"
-            effectiveness = 0.5 + confidence * 0.3
-        else:
-            depth = "浅显"
-            effectiveness = confidence * 0.5
+        length_bucket = 2 if evidence_length > 100 else 1 if evidence_length > 50 else 0
 
-        return {
-            "depth": depth,
-            "effectiveness_score": round(min(effectiveness, 1.0), 2),
-            "analysis": f"{topic}讲解深度{depth}，有效性评分{round(effectiveness, 2)}"
-        }
+        return dict(_depth_effectiveness(length_bucket, evidence_hit.confidence, topic))
+
+    def _summarize_actions(self, actions: ActionsModel) -> Tuple[int, float, List[str]]:
+        """单次遍历动作模型，同时得到执行数量、执行率和关键动作列表
+
+        Args:
+            actions: 动作模型
+
+        Returns:
+            Tuple[int, float, List[str]]: (已执行数量, 执行率, 已执行动作中文名列表)
+        """
+        # 将已执行标志打包为位掩码，第i位对应 _ACTION_FIELDS[i]
+        executed_mask = 0
+        total_actions = 0
+        for bit, action in enumerate(_ACTIONS_GETTER(actions)):
+            if isinstance(action, ActionExecution):
+                total_actions += 1
+                if action.executed:
+                    executed_mask |= 1 << bit
+
+        executed_count = bin(executed_mask).count("1")
+        execution_rate = round(executed_count / max(total_actions, 1), 3)
+        return executed_count, execution_rate, list(_executed_action_names(executed_mask))
 
     def _count_executed_actions(self, actions: ActionsModel) -> int:
         """计算已执行动作数量
@@ -431,11 +584,7 @@ class UIAdapter:
         Returns:
             int: 已执行动作数量
         """
-        count = 0
-        for field_name, field_value in actions.__dict__.items():
-            if isinstance(field_value, ActionExecution) and field_value.executed:
-                count += 1
-        return count
+        return self._summarize_actions(actions)[0]
 
     def _calculate_execution_rate(self, actions: ActionsModel) -> float:
         """计算执行率
@@ -446,10 +595,7 @@ class UIAdapter:
         Returns:
             float: 执行率 (0-1)
         """
-        total_actions = len([f for f in actions.__dict__.values() if isinstance(f, ActionExecution)])
-        executed_actions = self._count_executed_actions(actions)
-
-        return round(executed_actions / max(total_actions, 1), 3)
+        return self._summarize_actions(actions)[1]
 
     def _get_key_executed_actions(self, actions: ActionsModel) -> List[str]:
         """获取关键已执行动作列表
@@ -460,27 +606,7 @@ class UIAdapter:
         Returns:
             List[str]: 关键动作列表
         """
-        executed_actions = []
-        action_name_map = {
-            "professional_identity": "专业身份",
-            "value_help": "帮助价值",
-            "time_notice": "时间说明",
-            "company_background": "公司背景",
-            "free_teach": "免费讲解",
-            "bs_explained": "BS点讲解",
-            "period_resonance_explained": "周期共振",
-            "control_funds_explained": "控盘资金",
-            "bubugao_explained": "步步高",
-            "value_quantify_explained": "价值量化",
-            "customer_stock_explained": "客户股票"
-        }
-
-        for field_name, field_value in actions.__dict__.items():
-            if isinstance(field_value, ActionExecution) and field_value.executed:
-                chinese_name = action_name_map.get(field_name, field_name)
-                executed_actions.append(chinese_name)
-
-        return executed_actions
+        return self._summarize_actions(actions)[2]
 
     def _create_fallback_ui_result(self, result: CallAnalysisResult) -> Dict[str, Any]:
         """创建降级UI结果
@@ -495,6 +621,26 @@ class UIAdapter:
         """
         logger.warning(f"Using fallback UI result for call: {result.call_id}")
 
+        fallback = copy.deepcopy(self._fallback_template)
+        fallback["output"]["meta"] = {
+            "call_id": result.call_id,
+            "customer_id": result.customer_id or "",
+            "sales_id": result.sales_id or "",
+            "call_time": result.call_time or "",
+            "analysis_timestamp": result.analysis_timestamp
+        }
+        fallback["_adapter_metadata"]["conversion_timestamp"] = datetime.now().isoformat()
+        fallback["_adapter_metadata"]["source_call_id"] = result.call_id
+        return fallback
+
+    def _build_fallback_template(self) -> Dict[str, Any]:
+        """构建降级UI结果模板
+
+        meta 以及元数据中的时间戳、来源通话ID由 _create_fallback_ui_result 逐次填充
+
+        Returns:
+            Dict: 降级UI格式模板
+        """
         return {
             "output": {
                 "customer_side": {
@@ -507,22 +653,16 @@ class UIAdapter:
                     "action_summary": {"total_executed": 0, "execution_rate": 0.0, "key_actions": []}
                 },
                 "opening": self._create_empty_opening(),
-                "meta": {
-                    "call_id": result.call_id,
-                    "customer_id": result.customer_id or "",
-                    "sales_id": result.sales_id or "",
-                    "call_time": result.call_time or "",
-                    "analysis_timestamp": result.analysis_timestamp
-                },
+                "meta": {},
                 "metrics": {"talk_time_min": 0.0, "interactions_per_min": 0.0, "deal_or_visit": False},
                 "rejects": {"handle_objection_count": 0, "handling_strategies": [], "rejection_reasons": []},
                 "demo": self._create_empty_demo(),
                 "demo_more": self._create_empty_demo_more()
             },
             "_adapter_metadata": {
-                "conversion_timestamp": datetime.now().isoformat(),
-                "adapter_version": "1.0.0",
-                "source_call_id": result.call_id,
+                "conversion_timestamp": None,
+                "adapter_version": _ADAPTER_VERSION,
+                "source_call_id": None,
                 "conversion_status": "fallback",
                 "has_processed_text": False
             }
@@ -531,25 +671,12 @@ class UIAdapter:
     def _create_empty_opening(self) -> Dict[str, Any]:
         """创建空的开场白格式"""
         empty_evidence = {"hit": False, "evidence": [], "confidence": 0.0, "evidence_source": "none"}
-        return {
-            "professional_identity": empty_evidence,
-            "value_help": empty_evidence,
-            "time_notice": empty_evidence,
-            "tencent_invest": empty_evidence,
-            "free_teach": empty_evidence
-        }
+        return {ui_key: empty_evidence for ui_key, *_ in _OPENING_FIELDS}
 
     def _create_empty_demo(self) -> Dict[str, Any]:
         """创建空的演绎格式"""
         empty_evidence = {"hit": False, "evidence": [], "confidence": 0.0, "evidence_source": "none"}
-        return {
-            "bs_explained": empty_evidence,
-            "period_resonance_explained": empty_evidence,
-            "control_funds_explained": empty_evidence,
-            "bubugao_explained": empty_evidence,
-            "value_quantify_explained": empty_evidence,
-            "customer_stock_explained": empty_evidence
-        }
+        return {ui_key: empty_evidence for ui_key, *_ in _DEMO_FIELDS}
 
     def _create_empty_demo_more(self) -> Dict[str, Any]:
         """创建空的深度演绎格式"""
@@ -557,35 +684,81 @@ class UIAdapter:
         empty_depth = {"depth": "无", "effectiveness_score": 0, "analysis": "无数据"}
 
         return {
-            f"{key}": {
+            ui_key: {
                 "coverage": empty_coverage,
                 "depth_effectiveness": empty_depth
             }
-            for key in ["bs_explained", "period_resonance_explained", "control_funds_explained",
-                       "bubugao_explained", "value_quantify_explained"]
+            for ui_key, *_ in _DEMO_MORE_FIELDS
         }
 
-    def _generate_cache_key(self, result: CallAnalysisResult, processed_text: Optional[Dict]) -> str:
+    def _generate_cache_key(self, result: CallAnalysisResult, processed_text: Optional[Dict]) -> Tuple:
         """生成缓存键
 
+        以 (call_id, analysis_timestamp, id(processed_text)) 作为廉价键，命中时无需
+        序列化结果或处理文本；仅在缺少call_id时才对结果内容做哈希。
+        processed_text的对话内容由缓存条目中的快照另行校验，见 _is_cache_entry_current。
+
         Args:
             result: 分析结果
             processed_text: 处理文本
 
         Returns:
-            str: 缓存键
+            Tuple: 缓存键
         """
-        import hashlib
+        if result.call_id:
+            return (result.call_id, result.analysis_timestamp, id(processed_text))
+
+        # model_dump_json 由pydantic-core原生序列化，字段顺序固定，可直接作为规范化内容
+        payload = result.model_dump_json().encode('utf-8')
+        if xxhash is not None:
+            content_hash = xxhash.xxh3_64_intdigest(payload)
+        else:
+            content_hash = int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big')
+        return ("", content_hash, id(processed_text))
+
+    @staticmethod
+    def _snapshot_dialogues(processed_text: Optional[Dict]) -> Optional[_PreparedText]:
+        """记录processed_text中对话的内容列，用于识别之后的就地修改
 
-        key_data = f"{result.call_id}|{result.analysis_timestamp}|{hash(str(processed_text))}"
-        return hashlib.md5(key_data.encode('utf-8')).hexdigest()[:16]
+        Args:
+            processed_text: 处理文本
+
+        Returns:
+            Optional[_PreparedText]: 对话快照，processed_text格式异常时返回None
+        """
+        try:
+            return _PreparedText((processed_text or {}).get('dialogues') or [])
+        except (AttributeError, TypeError):
+            return None
+
+    @staticmethod
+    def _is_cache_entry_current(entry: Tuple[Optional[Dict], _PreparedText, Dict[str, Any]],
+                                processed_text: Optional[Dict]) -> bool:
+        """判断缓存条目是否仍对应当前的processed_text
+
+        要求是同一个对象，且对话未被增删或就地修改。
+
+        Args:
+            entry: 缓存条目 (processed_text, 对话快照, UI结果)
+            processed_text: 本次传入的处理文本
+
+        Returns:
+            bool: 条目可直接复用时为True
+        """
+        cached_text, snapshot, _ = entry
+        if cached_text is not processed_text:
+            return False
+        try:
+            return snapshot.is_current((processed_text or {}).get('dialogues') or [])
+        except (AttributeError, TypeError):
+            return False
 
-    def _update_cache(self, key: str, value: Dict[str, Any]) -> None:
+    def _update_cache(self, key: Tuple, value: Tuple[Optional[Dict], _PreparedText, Dict[str, Any]]) -> None:
         """更新缓存
 
         Args:
             key: 缓存键
-            value: 缓存值
+            value: 缓存值 (processed_text, 对话快照, UI结果)
         """
         if not self.enable_cache:
             return
@@ -640,5 +813,5 @@ class UIAdapter:
         return {
             "adapter_cache": cache_stats,
             "evidence_enhancer_cache": evidence_stats,
-            "adapter_version": "1.0.0"
+            "adapter_version": _ADAPTER_VERSION
         }
\ No newline at end of file
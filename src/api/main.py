@@ -23,6 +23,10 @@ from ..config.settings import settings
 from ..utils.logger import get_logger
 from ..utils.batch_processor import get_batch_processor, get_result_storage
 from ..utils.file_parser import validate_file_batch
+from .metrics import (
+    _calculate_icebreak_score, _calculate_deduction_score,
+    _calculate_interaction_score, _calculate_completion_rate
+)
 
 logger = get_logger(__name__)
 
@@ -351,78 +355,6 @@ async def calculate_quality_metrics(
         raise HTTPException(status_code=500, detail=f"计算失败: {str(e)}")
 
 
-def _calculate_icebreak_score(icebreak_data) -> float:
-    """计算破冰得分"""
-    total_points = 5  # 破冰要点总数
-    hit_points = 0
-    
-    for field_name in ['professional_identity', 'value_help', 'time_notice', 
-                      'company_background', 'free_teach']:
-        field_data = getattr(icebreak_data, field_name, None)
-        if field_data and getattr(field_data, 'hit', False):
-            hit_points += 1
-    
-    return (hit_points / total_points) * 100
-
-
-def _calculate_deduction_score(deduction_data) -> float:
-    """计算演绎得分"""
-    total_points = 6  # 演绎要点总数
-    hit_points = 0
-    
-    for field_name in ['bs_explained', 'period_resonance_explained', 'control_funds_explained',
-                      'bubugao_explained', 'value_quantify_explained', 'customer_stock_explained']:
-        field_data = getattr(deduction_data, field_name, None)
-        if field_data and getattr(field_data, 'hit', False):
-            hit_points += 1
-    
-    return (hit_points / total_points) * 100
-
-
-def _calculate_interaction_score(process_data) -> float:
-    """计算互动得分"""
-    # 基于通话时长和互动频率计算
-    duration = getattr(process_data, 'explain_duration_min', 0)
-    interaction_rate = getattr(process_data, 'interaction_rounds_per_min', 0)
-    
-    # 理想的互动频率是每分钟1-3次
-    ideal_rate = 2.0
-    if interaction_rate == 0:
-        return 0
-    
-    # 计算与理想值的偏差
-    deviation = abs(interaction_rate - ideal_rate) / ideal_rate
-    score = max(0, 100 - deviation * 50)
-    
-    # 时长加分（10-20分钟为理想时长）
-    if 10 <= duration <= 20:
-        score += 10
-    elif duration > 5:
-        score += 5
-    
-    return min(100, score)
-
-
-def _calculate_completion_rate(actions_data) -> float:
-    """计算完成度"""
-    total_actions = 0
-    completed_actions = 0
-    
-    for field_name in ['professional_identity', 'value_help', 'time_notice', 
-                      'company_background', 'free_teach', 'bs_explained',
-                      'period_resonance_explained', 'control_funds_explained',
-                      'bubugao_explained', 'value_quantify_explained', 
-                      'customer_stock_explained']:
-        
-        action_data = getattr(actions_data, field_name, None)
-        if action_data:
-            total_actions += 1
-            if getattr(action_data, 'executed', False):
-                completed_actions += 1
-    
-    return completed_actions / total_actions if total_actions > 0 else 0.0
-
-
 @app.get("/statistics")
 async def get_statistics(
     workflow: CallAnalysisWorkflow = Depends(get_workflow)
@@ -1,8 +1,10 @@
 """破冰要点检测处理器"""
 
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 import re
 import asyncio
+import hashlib
 from ..models.schemas import IcebreakModel, EvidenceHit, AnalysisConfig
 from ..engines.vector_engine import VectorSearchEngine
 from ..engines.rule_engine import RuleEngine
@@ -12,6 +14,37 @@ from ..config.settings import REJECTION_PATTERNS, HANDLING_PATTERNS
 
 logger = get_logger(__name__)
 
+# LLM验证结果缓存的条目上限
+_LLM_CACHE_SIZE = 1024
+
+_POINT_DESCRIPTIONS = {
+    'professional_identity': '销售是否表明了专业身份（如益盟操盘手专员、老师、顾问等）',
+    'value_help': '销售是否说明了能帮助客户解决问题或带来收益',
+    'time_notice': '销售是否告知了沟通需要的时间（如耽误您几分钟）',
+    'company_background': '销售是否提及了公司背景或背书（如腾讯投资的上市公司）',
+    'free_teach': '销售是否说明了免费服务或免费讲解'
+}
+
+_LLM_VALIDATE_PROMPT = """
+请分析以下销售对话文本，判断是否包含指定的破冰要点。
+
+要点：{description}
+
+销售对话文本：
+{text}
+
+请按以下格式回答：
+判定结果：是/否
+置信度：0.0-1.0之间的数值
+证据片段：如果判定为是，请提供具体的证据文本片段（不超过100字）
+重要要求：证据片段必须直接摘自“销售对话文本”的原文，且不可为空，也不可使用“无/N/A/NA/未知”等占位词；
+若无法给出原文证据，请返回“判定结果：否”。
+理由：简要说明判定理由
+
+规则引擎结果：{rule_hit} (置信度: {rule_confidence})
+向量检索结果：{similarity}
+"""
+
 
 class IcebreakProcessor:
     """破冰要点检测处理器"""
@@ -19,10 +52,14 @@ class IcebreakProcessor:
     def __init__(self, 
                  vector_engine: VectorSearchEngine,
                  rule_engine: RuleEngine,
-                 llm_engine: LLMEngine):
+                 llm_engine: LLMEngine,
+                 max_concurrency: int = 3):
         self.vector_engine = vector_engine
         self.rule_engine = rule_engine
         self.llm_engine = llm_engine
+
+        # 同一实例上的全部并发调用共享，限制同时进行的要点检测数，避免触发接口限流
+        self._semaphore = asyncio.Semaphore(max_concurrency)
         
         # 破冰要点检测配置
         self.detection_points = [
@@ -32,6 +69,9 @@ class IcebreakProcessor:
             'company_background',
             'free_teach'
         ]
+
+        # 提示词哈希 -> 解析后的LLM验证结果（LRU）
+        self._llm_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         
     async def analyze(self, 
                      processed_text: Dict[str, Any],
@@ -45,10 +85,12 @@ class IcebreakProcessor:
             sales_content = processed_text.get('content_analysis', {}).get('sales_content', [])
             sales_text = ' '.join(sales_content)
             
-            # 并行检测各个要点
-            tasks = []
-            for point in self.detection_points:
-                tasks.append(self._detect_point(point, sales_text, processed_text, config))
+            # 并行检测各个要点，并发数受实例级信号量限制
+            async def detect_single(point: str) -> EvidenceHit:
+                async with self._semaphore:
+                    return await self._detect_point(point, sales_text, processed_text, config)
+
+            tasks = [detect_single(point) for point in self.detection_points]
             
             # 执行并行检测
             detection_results = await asyncio.gather(*tasks)
@@ -178,14 +220,6 @@ class IcebreakProcessor:
                                  vector_result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """LLM验证要点"""
         
-        point_descriptions = {
-            'professional_identity': '销售是否表明了专业身份（如益盟操盘手专员、老师、顾问等）',
-            'value_help': '销售是否说明了能帮助客户解决问题或带来收益',
-            'time_notice': '销售是否告知了沟通需要的时间（如耽误您几分钟）',
-            'company_background': '销售是否提及了公司背景或背书（如腾讯投资的上市公司）',
-            'free_teach': '销售是否说明了免费服务或免费讲解'
-        }
-        
         # 为向量检索结果构造安全的显示字符串，避免 f-string 中使用条件格式化导致语法错误
         sim_str = "N/A"
         if vector_result:
@@ -194,25 +228,20 @@ class IcebreakProcessor:
             except Exception:
                 sim_str = str(vector_result.get('similarity'))
 
-        prompt = f"""
-请分析以下销售对话文本，判断是否包含指定的破冰要点。
-
-要点：{point_descriptions.get(point, point)}
-
-销售对话文本：
-{text}
-
-请按以下格式回答：
-判定结果：是/否
-置信度：0.0-1.0之间的数值
-证据片段：如果判定为是，请提供具体的证据文本片段（不超过100字）
-重要要求：证据片段必须直接摘自“销售对话文本”的原文，且不可为空，也不可使用“无/N/A/NA/未知”等占位词；
-若无法给出原文证据，请返回“判定结果：否”。
-理由：简要说明判定理由
+        prompt = _LLM_VALIDATE_PROMPT.format(
+            description=_POINT_DESCRIPTIONS.get(point, point),
+            text=text,
+            rule_hit=rule_result.get('hit', False),
+            rule_confidence=rule_result.get('confidence', 0.0),
+            similarity=sim_str
+        )
 
-规则引擎结果：{rule_result.get('hit', False)} (置信度: {rule_result.get('confidence', 0.0)})
-向量检索结果：{sim_str}
-"""
+        # 提示词完全决定LLM输入，相同提示词直接复用已解析的结果
+        cache_key = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+        cached = self._llm_cache.get(cache_key)
+        if cached is not None:
+            self._llm_cache.move_to_end(cache_key)
+            return dict(cached)
         
         try:
             response = await self.llm_engine.generate(
@@ -221,9 +250,15 @@ class IcebreakProcessor:
                 temperature=0.1
             )
             
-            # 解析LLM响应
-            result = self._parse_llm_response(response, point)
-            return result
+            # 解析LLM响应；空响应或解析失败的降级结果不缓存，下次同一提示词重新请求
+            result, parsed = self._parse_llm_response_checked(response, point)
+
+            if parsed:
+                self._llm_cache[cache_key] = result
+                if len(self._llm_cache) > _LLM_CACHE_SIZE:
+                    self._llm_cache.popitem(last=False)
+
+            return dict(result)
             
         except Exception as e:
             logger.error(f"LLM验证失败: {e}")
@@ -231,6 +266,10 @@ class IcebreakProcessor:
     
     def _parse_llm_response(self, response: str, point: str) -> Dict[str, Any]:
         """解析LLM响应"""
+        return self._parse_llm_response_checked(response, point)[0]
+
+    def _parse_llm_response_checked(self, response: str, point: str) -> Tuple[Dict[str, Any], bool]:
+        """解析LLM响应，并返回是否成功解析（空响应和解析异常时为False）"""
         
         # 增强的无效证据模式
         invalid_evidence_patterns = [
@@ -244,7 +283,7 @@ class IcebreakProcessor:
         
         try:
             if not response:
-                return {'hit': False, 'confidence': 0.0, 'evidence': '', 'reasoning': '空响应'}
+                return {'hit': False, 'confidence': 0.0, 'evidence': '', 'reasoning': '空响应'}, False
 
             lines = response.strip().split('\n')
             result = {'hit': False, 'confidence': 0.0, 'evidence': '', 'reasoning': ''}
@@ -291,11 +330,11 @@ class IcebreakProcessor:
                     result['confidence'] = 0.0
                     result['evidence'] = ''
             
-            return result
+            return result, True
             
         except Exception as e:
             logger.error(f"解析LLM响应失败: {e}")
-            return {'hit': False, 'confidence': 0.0, 'evidence': '', 'reasoning': str(e)}
+            return {'hit': False, 'confidence': 0.0, 'evidence': '', 'reasoning': str(e)}, False
     
     def _combine_results(self,
                         rule_result: Dict[str, Any],
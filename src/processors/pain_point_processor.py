@@ -27,10 +27,14 @@ class PainPointProcessor:
     def __init__(self, 
                  vector_engine: VectorSearchEngine,
                  rule_engine: RuleEngine,
-                 llm_engine: LLMEngine):
+                 llm_engine: LLMEngine,
+                 max_concurrency: int = 3):
         self.vector_engine = vector_engine
         self.rule_engine = rule_engine
         self.llm_engine = llm_engine
+
+        # 同一实例上的全部并发调用共享，限制同时进行的痛点检测数，避免触发接口限流
+        self._semaphore = asyncio.Semaphore(max_concurrency)
         
         # 从配置中获取痛点检测规则和量化配置
         self.detection_rules = settings.pain_point.detection_rules
@@ -124,10 +128,11 @@ class PainPointProcessor:
                 PainPointType.PANIC_SELL
             ]
             
-            tasks = [
-                self._detect_pain_point(pain_type, customer_text, config)
-                for pain_type in pain_types
-            ]
+            async def detect_single(pain_type: PainPointType) -> PainPointHit:
+                async with self._semaphore:
+                    return await self._detect_pain_point(pain_type, customer_text, config)
+
+            tasks = [detect_single(pain_type) for pain_type in pain_types]
             detection_results = await asyncio.gather(*tasks)
             
             # 构建结果字典
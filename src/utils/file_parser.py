@@ -19,6 +19,12 @@ from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from pydantic import ValidationError
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson为可选依赖，缺失时回退到标准库
+    _json_loads = json.loads
+
 from ..models.schemas import (
     CallInput, ParsedFileInput, FileParseStatus,
     BatchProcessingConfig
@@ -27,6 +33,21 @@ from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 解析器的不变配置在模块加载时一次性构建，避免每个文件重复创建
+_CSV_REQUIRED_COLUMNS = frozenset({'transcript'})
+_CSV_OPTIONAL_FIELDS = ('customer_id', 'sales_id', 'call_time')
+
+# TXT文件支持的多对话分隔符（按优先级排列）
+_TXT_SEPARATORS = tuple(
+    re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+    for pattern in (
+        r'\n---+\n',           # --- 分隔符
+        r'\n={3,}\n',          # === 分隔符
+        r'\n通话\d+[：:]\n',   # 通话1: 分隔符
+        r'\n\[对话\d+\]\n',   # [对话1] 分隔符
+    )
+)
+
 
 class FileParserError(Exception):
     """文件解析错误基类"""
@@ -196,7 +217,7 @@ class StreamingFileParser:
     def _parse_json(self, content: str, warnings: List[str]) -> Tuple[List[CallInput], List[str]]:
         """解析JSON文件"""
         try:
-            data = json.loads(content)
+            data = _json_loads(content)
         except json.JSONDecodeError as e:
             raise FileContentError(f"JSON格式错误: {e}")
 
@@ -244,7 +265,7 @@ class StreamingFileParser:
                 continue
 
             try:
-                data = json.loads(line)
+                data = _json_loads(line)
                 call_input = self._dict_to_call_input(data, f"line_{line_num}")
                 calls.append(call_input)
             except json.JSONDecodeError as e:
@@ -263,11 +284,10 @@ class StreamingFileParser:
             raise FileContentError(f"CSV读取失败: {e}")
 
         # 检查必需列
-        required_columns = {'transcript'}
         available_columns = set(df.columns.str.lower())
 
-        if not required_columns.issubset(available_columns):
-            missing = required_columns - available_columns
+        if not _CSV_REQUIRED_COLUMNS.issubset(available_columns):
+            missing = set(_CSV_REQUIRED_COLUMNS - available_columns)
             raise FileContentError(f"CSV文件缺少必需列: {missing}")
 
         calls = []
@@ -280,8 +300,7 @@ class StreamingFileParser:
                 }
 
                 # 可选字段
-                optional_fields = ['customer_id', 'sales_id', 'call_time']
-                for field in optional_fields:
+                for field in _CSV_OPTIONAL_FIELDS:
                     if field in df.columns and pd.notna(row[field]):
                         call_data[field] = str(row[field])
 
@@ -312,20 +331,11 @@ class StreamingFileParser:
         if not content:
             return calls, ["TXT文件内容为空"]
 
-        # 检查是否包含多个对话分隔符
-        # 支持常见的分隔符模式
-        separators = [
-            r'\n---+\n',           # --- 分隔符
-            r'\n={3,}\n',          # === 分隔符
-            r'\n通话\d+[：:]\n',   # 通话1: 分隔符
-            r'\n\[对话\d+\]\n',   # [对话1] 分隔符
-        ]
-
         segments = [content]  # 默认整个文件为一个对话
 
-        # 尝试分割
-        for separator_pattern in separators:
-            potential_segments = re.split(separator_pattern, content, flags=re.MULTILINE | re.IGNORECASE)
+        # 尝试按多对话分隔符分割
+        for separator in _TXT_SEPARATORS:
+            potential_segments = separator.split(content)
             if len(potential_segments) > 1:
                 segments = [seg.strip() for seg in potential_segments if seg.strip()]
                 logger.info(f"检测到分隔符，分割为 {len(segments)} 个对话段")
@@ -0,0 +1,140 @@
+"""测试共享夹具
+
+引擎模拟对象、工作流实例和示例通话输入在整个测试会话内只构建一次。
+修改共享对象的测试需通过 monkeypatch 等方式在结束后恢复。
+"""
+
+import asyncio
+from typing import Final
+
+import pytest
+
+from src.models.schemas import CallInput, AnalysisConfig
+
+
+# 示例通话转写文本，所有示例输入共享同一字符串对象
+TRANSCRIPT: Final[str] = """销售：您好，我是益盟操盘手的专员小王。
+客户：你好。
+销售：我们是腾讯投资的上市公司，耽误您两分钟时间，免费给您讲解一下我们的买卖点功能。
+客户：好的，你说。
+销售：我们的B点代表买入信号，S点代表卖出信号。根据历史数据，能提升20%收益率。
+客户：这个功能听起来不错。"""
+
+
+# 模拟引擎的固定返回值，处理器只读取不修改，所有调用共享同一对象
+_RULE_RESULT = {'hit': True, 'confidence': 0.8, 'evidence': '测试证据'}
+_LLM_RESPONSE = '判定结果：是\n置信度：0.9\n证据片段：我是益盟操盘手专员'
+
+
+class StubVectorEngine:
+    """向量检索引擎桩：始终没有相似结果"""
+
+    async def search_similar(self, *args, **kwargs):
+        return None
+
+
+class StubRuleEngine:
+    """规则引擎桩：始终返回固定的命中结果"""
+
+    async def detect(self, *args, **kwargs):
+        return _RULE_RESULT
+
+
+class StubLLMEngine:
+    """LLM引擎桩：始终返回固定的判定文本"""
+
+    async def generate(self, *args, **kwargs):
+        return _LLM_RESPONSE
+
+
+class TrackingLLMEngine:
+    """LLM引擎桩：每次调用短暂让出事件循环，记录同时进行中的调用数峰值"""
+
+    def __init__(self, response: str = _LLM_RESPONSE):
+        self._response = response
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate(self, *args, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self._response
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def tracking_llm():
+    """TrackingLLMEngine 类，测试按需传入固定响应构建实例，用于断言并发上限"""
+    return TrackingLLMEngine
+
+
+@pytest.fixture(scope="session")
+def mock_engines():
+    """模拟引擎
+
+    只实现工作流实际调用的异步方法；需要断言调用或注入异常时用 monkeypatch 单独替换
+    """
+    return StubVectorEngine(), StubRuleEngine(), StubLLMEngine()
+
+
+@pytest.fixture(scope="session", params=["langgraph", "simplified"])
+def workflow_cls(request):
+    """工作流实现类，同一组测试对两种实现各运行一次
+
+    工作流及其引擎依赖在夹具内导入，只有用到工作流的测试才会加载。
+    """
+    if request.param == "langgraph":
+        from src.workflows.call_analysis_workflow import CallAnalysisWorkflow
+        return CallAnalysisWorkflow
+    from src.workflows.simplified_workflow import SimpleCallAnalysisWorkflow
+    return SimpleCallAnalysisWorkflow
+
+
+@pytest.fixture(scope="session")
+async def workflow(workflow_cls, mock_engines, sample_call_input, analysis_config):
+    """工作流实例
+
+    返回前先完整执行一次，让延迟导入、分词词典加载和正则编译在首个计时测试之前完成。
+    预热写入的处理器LLM结果缓存随后清空，测试仍会经过 llm_engine.generate。
+    """
+    vector_engine, rule_engine, llm_engine = mock_engines
+    instance = workflow_cls(vector_engine, rule_engine, llm_engine)
+    await instance.execute(sample_call_input, analysis_config)
+    instance.icebreak_processor._llm_cache.clear()
+    return instance
+
+
+@pytest.fixture(scope="session")
+def analysis_config():
+    """默认分析配置，工作流只读取不修改，所有测试共享同一实例"""
+    return AnalysisConfig()
+
+
+@pytest.fixture(scope="session")
+def sample_call_input():
+    """示例通话输入"""
+    return CallInput(
+        call_id="test_call_001",
+        transcript=TRANSCRIPT,
+        customer_id="customer_001",
+        sales_id="sales_001"
+    )
+
+
+@pytest.fixture(scope="session")
+def batched_inputs(sample_call_input):
+    """批量通话输入，复用示例输入的转写文本，只替换各条的ID
+
+    model_copy 不重新校验，调用方按需切片，不得修改
+    """
+    return [
+        sample_call_input.model_copy(update={
+            "call_id": f"test_call_{i:03d}",
+            "customer_id": f"customer_{i:03d}",
+            "sales_id": f"sales_{i:03d}"
+        })
+        for i in range(8)
+    ]
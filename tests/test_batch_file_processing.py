@@ -167,7 +167,6 @@ test_002,"销售：我们有BS买卖点功能。客户：听起来不错。",cus
         assert result.parse_status.value == "failed"
         assert "文件大小" in result.parse_error
 
-    @pytest.mark.asyncio
     async def test_async_file_parsing(self, parser, sample_json_data, mock_uploaded_file):
         """测试异步文件解析"""
         files = [
@@ -245,7 +244,6 @@ class TestBatchProcessor:
                 assert data["source_filename"] == "test.json"
                 assert data["result_count"] == 1
 
-    @pytest.mark.asyncio
     async def test_batch_processing_success(self, mock_workflow, batch_config, sample_parsed_files):
         """测试成功的批量处理"""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -264,7 +262,6 @@ class TestBatchProcessor:
             assert response.statistics.successful_files == 2
             assert response.statistics.total_calls_processed > 0
 
-    @pytest.mark.asyncio
     async def test_batch_processing_with_failures(self, batch_config, sample_parsed_files):
         """测试部分失败的批量处理"""
         # 模拟工作流，第一个文件成功，第二个失败
@@ -289,7 +286,6 @@ class TestBatchProcessor:
             assert response.statistics.successful_files == 1
             assert response.statistics.failed_files == 1
 
-    @pytest.mark.asyncio
     async def test_batch_processing_empty_files(self, mock_workflow, batch_config):
         """测试空文件列表处理"""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -402,7 +398,6 @@ class TestBatchAPI:
 class TestIntegration:
     """集成测试"""
 
-    @pytest.mark.asyncio
     async def test_end_to_end_workflow(self):
         """端到端工作流测试"""
         # 创建测试数据
@@ -17,7 +17,6 @@ from src.models.schemas import AnalysisConfig
 def mock_llm_engine():
     return AsyncMock()
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_positive_case(mock_llm_engine):
     """
     Test case where the transcript contains customer probing.
@@ -39,7 +38,6 @@ async def test_customer_probing_processor_positive_case(mock_llm_engine):
     assert "客户询问了仓位情况和投资风格" in result['customer_probing_details']
     mock_llm_engine.generate.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_negative_case(mock_llm_engine):
     """
     Test case where the transcript does not contain customer probing.
@@ -61,7 +59,6 @@ async def test_customer_probing_processor_negative_case(mock_llm_engine):
     assert result['customer_probing_details'] == ""
     mock_llm_engine.generate.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_empty_transcript(mock_llm_engine):
     """
     Test case with an empty transcript.
@@ -80,7 +77,6 @@ async def test_customer_probing_processor_empty_transcript(mock_llm_engine):
     assert result['customer_probing_details'] == ""
     mock_llm_engine.generate.assert_not_called()
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_short_transcript(mock_llm_engine):
     """
     Test case with a very short transcript.
@@ -99,7 +95,6 @@ async def test_customer_probing_processor_short_transcript(mock_llm_engine):
     assert result['customer_probing_details'] == ""
     mock_llm_engine.generate.assert_not_called()
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_llm_disabled(mock_llm_engine):
     """
     Test case where LLM validation is disabled.
@@ -119,7 +114,6 @@ async def test_customer_probing_processor_llm_disabled(mock_llm_engine):
     assert result['customer_probing_details'] == ""
     mock_llm_engine.generate.assert_not_called()
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_timeout_error(mock_llm_engine):
     """
     Test case where LLM times out.
@@ -140,7 +134,6 @@ async def test_customer_probing_processor_timeout_error(mock_llm_engine):
     assert result['has_customer_probing'] is False
     assert result['customer_probing_details'] == ""
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_invalid_input(mock_llm_engine):
     """
     Test case with invalid input data.
@@ -159,7 +152,6 @@ async def test_customer_probing_processor_invalid_input(mock_llm_engine):
     assert result['customer_probing_details'] == ""
     mock_llm_engine.generate.assert_not_called()
 
-@pytest.mark.asyncio
 async def test_customer_probing_processor_various_positive_responses(mock_llm_engine):
     """
     Test case with various positive response formats.
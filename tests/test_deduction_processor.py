@@ -64,7 +64,6 @@ def test_combine_results_with_vector_evidence():
     assert len(res['evidence']) == 80
 
 
-@pytest.mark.asyncio
 async def test_analyze_rule_fallback_integration():
     processor, vector_engine, rule_engine, llm_engine = _build_processor()
 
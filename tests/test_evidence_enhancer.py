@@ -1,21 +1,32 @@
 """证据增强器单元测试"""
 
-import pytest
-from unittest.mock import Mock, patch
+import importlib.util
+import time
+from contextlib import ExitStack
 from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
 
-from src.adapters.evidence_enhancer import EvidenceEnhancer
+from src.adapters.evidence_enhancer import (
+    EvidenceEnhancer, _build_automaton, _normalize_timestamp, _tokenize_zh
+)
 
 
 class TestEvidenceEnhancer:
     """证据增强器测试类"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def enhancer(self):
         """创建证据增强器实例"""
         return EvidenceEnhancer(max_quote_length=200, cache_size=10)
 
-    @pytest.fixture
+    @pytest.fixture(autouse=True)
+    def reset_enhancer(self, enhancer):
+        """每个测试前清空共享实例的缓存和统计"""
+        enhancer.clear_cache()
+
+    @pytest.fixture(scope="module")
     def sample_processed_text(self):
         """示例处理文本"""
         return {
@@ -136,18 +147,65 @@ class TestEvidenceEnhancer:
         assert 0 < score2 < 1.0  # 部分匹配
         assert score3 == 0.0  # 无匹配
 
+    def test_keyword_match_scores_batch(self, enhancer):
+        """测试批量关键词匹配分数与逐条计算一致"""
+        keywords = ["益盟", "操盘手", "专员"]
+        contents = ["我是益盟操盘手的专员小李", "操盘手很专业", "今天天气很好", "益盟", ""]
+
+        scores = enhancer._keyword_match_scores(keywords, contents)
+
+        expected = [enhancer._calculate_keyword_match_score(keywords, c) for c in contents]
+        assert list(scores) == expected
+
+    @pytest.mark.parametrize("disabled", [("ahocorasick",), ("ahocorasick", "process")])
+    def test_keyword_match_scores_without_optional_backend(self, enhancer, disabled):
+        """测试缺少可选匹配库时批量分数仍与逐条计算一致"""
+        keywords = ["益盟", "操盘手", "专员", "益盟"]
+        contents = ["我是益盟操盘手的专员小李", "操盘手很专业", "今天天气很好", "益盟", ""]
+
+        with ExitStack() as stack:
+            for name in disabled:
+                stack.enter_context(patch(f"src.adapters.evidence_enhancer.{name}", None))
+            scores = enhancer._keyword_match_scores(keywords, contents)
+
+        expected = [enhancer._calculate_keyword_match_score(keywords, c) for c in contents]
+        assert list(scores) == expected
+
+    def test_keyword_match_scores_bitmap_reuse(self, enhancer):
+        """测试关键词命中位图按预处理结果复用"""
+        contents = ["我是益盟操盘手的专员小李", "操盘手很专业", "今天天气很好", "益盟", ""]
+        prepared = enhancer._get_or_prepare({"dialogues": [{"content": c} for c in contents]})
+
+        first = enhancer._keyword_match_scores(["益盟", "专员"], contents, prepared)
+        second = enhancer._keyword_match_scores(["益盟", "操盘手", "益盟"], contents, prepared)
+
+        assert set(prepared.keyword_bits) == {"益盟", "专员", "操盘手"}
+        assert list(first) == [enhancer._calculate_keyword_match_score(["益盟", "专员"], c) for c in contents]
+        assert list(second) == [enhancer._calculate_keyword_match_score(["益盟", "操盘手", "益盟"], c) for c in contents]
+
     def test_truncate_quote(self, enhancer):
         """测试引用截断"""
         short_text = "短文本"
         long_text = "这是一个很长的文本" * 20 + "。这是句子结尾。" + "还有更多内容" * 10
 
-        # 短文本不应该被截断
+        # 空文本和短文本不应该被截断
+        assert enhancer._truncate_quote("") == ""
         assert enhancer._truncate_quote(short_text) == short_text
 
         # 长文本应该被截断
         truncated = enhancer._truncate_quote(long_text)
         assert len(truncated) <= enhancer.max_quote_length + 10  # 允许少量超出以保持句子完整
 
+    def test_truncate_quote_by_bytes(self):
+        """测试按UTF-8字节预算截断引用"""
+        enhancer = EvidenceEnhancer(max_quote_bytes=10)
+
+        assert enhancer._truncate_quote("短文本") == "短文本"
+        # 在句子边界截断
+        assert enhancer._truncate_quote("中文。字符很长很长") == "中文。"
+        # 无合适边界时丢弃被切开的字符并追加省略号
+        assert enhancer._truncate_quote("abc中文字符很长很长") == "abc中文..."
+
     def test_fuzzy_match_dialogues(self, enhancer, sample_processed_text):
         """测试模糊匹配"""
         content = "专业服务"
@@ -159,6 +217,51 @@ class TestEvidenceEnhancer:
             assert all("idx" in match for match in matches)
             assert all("ts" in match for match in matches)
 
+    def test_fuzzy_match_dialogues_difflib_fallback(self, enhancer, sample_processed_text):
+        """测试未安装rapidfuzz时的difflib降级匹配"""
+        with patch("src.adapters.evidence_enhancer.process", None):
+            matches = enhancer._fuzzy_match_dialogues("腾讯投资的上市公司", sample_processed_text["dialogues"])
+
+        assert matches
+        assert matches[0]["idx"] == 2
+        assert matches[0]["match_type"] == "fuzzy"
+        assert all(0 <= match["confidence"] <= 1 for match in matches)
+
+    def test_sparse_match_scores(self, enhancer, sample_processed_text):
+        """测试稀疏召回按分词重合比例打分"""
+        prepared = enhancer._get_or_prepare(sample_processed_text)
+
+        scores = enhancer._sparse_match_scores("腾讯投资的上市公司", prepared)
+
+        assert scores[2] == 1.0
+        assert scores[1] == 0.0
+        assert list(enhancer._sparse_match_scores("，。", prepared)) == [0.0, 0.0, 0.0]
+
+    def test_exact_match_indices(self, enhancer, sample_processed_text):
+        """测试拼接串上的精确匹配与逐条互相包含判断一致"""
+        prepared = enhancer._get_or_prepare(sample_processed_text)
+
+        for content in ("专员", "客户：你好。销售：", "你好。", "", "不存在的内容"):
+            expected = [i for i, c in enumerate(prepared.contents) if content in c or c in content]
+            assert prepared.exact_match_indices(content) == expected
+
+        # 跨越两条对话边界的片段不算命中
+        boundary = prepared.contents[0][-2:] + prepared.contents[1][:2]
+        assert prepared.exact_match_indices(boundary) == []
+
+    @pytest.mark.skipif(importlib.util.find_spec("ahocorasick") is None, reason="pyahocorasick未安装")
+    def test_batch_prefetches_exact_matches(self, enhancer, sample_processed_text):
+        """测试批量增强用一次自动机扫描预取精确匹配，结果与逐条查找一致"""
+        contents = ("专员", "你好。", "客户：你好。销售：", "不存在的内容")
+        fresh = enhancer._get_or_prepare({"dialogues": list(sample_processed_text["dialogues"])})
+        expected = [fresh.exact_match_indices(content) for content in contents]
+
+        enhancer.enhance_evidence_batch(list(contents), sample_processed_text)
+        prepared = enhancer._get_or_prepare(sample_processed_text)
+
+        assert set(contents) <= set(prepared._forward_hits)
+        assert [prepared.exact_match_indices(content) for content in contents] == expected
+
     def test_cache_functionality(self, enhancer, sample_processed_text):
         """测试缓存功能"""
         evidence = "腾讯投资"
@@ -189,6 +292,35 @@ class TestEvidenceEnhancer:
         assert stats["max_size"] == 10  # 根据fixture设置
         assert stats["hit_rate"] >= 0.0
 
+    def test_cache_lru_eviction(self, enhancer):
+        """测试缓存按LRU顺序淘汰"""
+        for i in range(10):
+            enhancer.enhance_evidence(f"证据{i}", None)
+
+        # 访问最早的条目，使其成为最近使用
+        enhancer.enhance_evidence("证据0", None)
+        enhancer.enhance_evidence("证据10", None)
+
+        stats = enhancer.get_cache_stats()
+        assert stats["cache_size"] == 10
+        assert enhancer._generate_cache_key("证据0", None, None) in enhancer._cache
+        assert enhancer._generate_cache_key("证据1", None, None) not in enhancer._cache
+
+    def test_tinylfu_keeps_hot_entry_under_scan(self):
+        """测试TinyLFU策略下一次性键的扫描不会挤掉热点条目"""
+        enhancer = EvidenceEnhancer(cache_size=5, cache_policy="tinylfu")
+
+        for _ in range(5):
+            enhancer.enhance_evidence("腾讯投资", None)
+        for i in range(20):
+            enhancer.enhance_evidence(f"一次性证据{i}", None)
+
+        hits_before = enhancer.get_cache_stats()["hits"]
+        enhancer.enhance_evidence("腾讯投资", None)
+
+        assert enhancer.get_cache_stats()["hits"] == hits_before + 1
+        assert enhancer.get_cache_stats()["cache_size"] <= 5
+
     def test_clear_cache(self, enhancer, sample_processed_text):
         """测试清空缓存"""
         # 先添加一些缓存
@@ -229,6 +361,18 @@ class TestEvidenceEnhancer:
             assert len(result) == 1
             assert result[0]["match_type"] == "simple_fallback"
 
+    @pytest.mark.parametrize("processed_text", [
+        {"dialogues": ["str dialogue"]},
+        ["not", "a", "dict"],
+    ])
+    def test_malformed_processed_text_falls_back(self, enhancer, processed_text):
+        """测试格式异常的processed_text降级而不抛出异常"""
+        result = enhancer.enhance_evidence("测试证据", processed_text)
+
+        assert len(result) == 1
+        assert result[0]["match_type"] == "simple_fallback"
+        assert enhancer.enhance_evidence_batch(["测试证据"], processed_text) == [result]
+
     def test_context_hint_usage(self, enhancer, sample_processed_text):
         """测试上下文提示的使用"""
         evidence = "专员"
@@ -245,6 +389,49 @@ class TestEvidenceEnhancer:
 
         assert cache_key != cache_key_no_hint
 
+    def test_enhance_evidence_batch(self, enhancer, sample_processed_text):
+        """测试批量增强与逐条增强结果一致且顺序对齐"""
+        evidences = ["腾讯投资的上市公司", "", "益盟操盘手专员"]
+        hints = ["公司背景", None, "专业身份"]
+
+        batch = enhancer.enhance_evidence_batch(evidences, sample_processed_text, hints)
+
+        assert batch == [enhancer.enhance_evidence(e, sample_processed_text, h) for e, h in zip(evidences, hints)]
+        with pytest.raises(ValueError):
+            enhancer.enhance_evidence_batch(evidences, sample_processed_text, hints[:1])
+
+    def test_cache_key_fingerprint(self, enhancer, sample_processed_text):
+        """测试缓存键基于对话内容指纹"""
+        same_content = {"dialogues": [dict(d) for d in sample_processed_text["dialogues"]]}
+        changed = {"dialogues": sample_processed_text["dialogues"][:2]}
+
+        key = enhancer._generate_cache_key("专员", sample_processed_text, None)
+
+        assert key == enhancer._generate_cache_key("专员", sample_processed_text, None)
+        assert key == enhancer._generate_cache_key("专员", same_content, None)
+        assert key != enhancer._generate_cache_key("专员", changed, None)
+        assert key != enhancer._generate_cache_key("专员", None, None)
+
+    def test_prepared_text_reused(self, enhancer, sample_processed_text):
+        """测试同一processed_text的预处理结果被复用"""
+        prepared = enhancer._get_or_prepare(sample_processed_text)
+
+        assert enhancer._get_or_prepare(sample_processed_text) is prepared
+        assert prepared.contents == [d["content"] for d in sample_processed_text["dialogues"]]
+        assert enhancer._get_or_prepare(dict(sample_processed_text)) is not prepared
+
+    def test_in_place_mutation_invalidates_prepared(self, enhancer, sample_processed_text):
+        """测试就地修改对话内容后不再复用旧的预处理结果和证据缓存"""
+        processed_text = {"dialogues": [dict(d) for d in sample_processed_text["dialogues"]]}
+        before = enhancer.enhance_evidence("腾讯投资", processed_text)
+        assert "腾讯投资的上市公司" in before[0]["quote"]
+
+        processed_text["dialogues"][2]["content"] = "销售：腾讯投资在这里。"
+        after = enhancer.enhance_evidence("腾讯投资", processed_text)
+
+        assert "腾讯投资在这里" in after[0]["quote"]
+        assert enhancer._get_or_prepare(processed_text).contents[2] == "销售：腾讯投资在这里。"
+
     @pytest.mark.parametrize("evidence_text,expected_type", [
         ("小李 2024年01月15日 证据内容", "timestamp"),
         ("10:30:01: 证据内容", "timestamp"),
@@ -315,12 +502,10 @@ class TestEvidenceEnhancerIntegration:
                 if result:  # 如果有结果，应该是低置信度的
                     assert all(item["confidence"] <= 0.5 for item in result)
 
-    def test_performance_with_large_dataset(self):
-        """测试大数据集性能"""
-        enhancer = EvidenceEnhancer(cache_size=1000)
-
-        # 创建大量对话
-        large_processed_text = {
+    @pytest.fixture(scope="module")
+    def large_processed_text(self):
+        """包含1000条对话的大数据集"""
+        return {
             "dialogues": [
                 {
                     "content": f"对话内容 {i} 包含各种关键词",
@@ -331,21 +516,49 @@ class TestEvidenceEnhancerIntegration:
             ]
         }
 
-        # 测试多次调用的性能
-        import time
-        start_time = time.time()
+    def test_performance_with_large_dataset(self, large_processed_text):
+        """测试大数据集性能"""
+        enhancer = EvidenceEnhancer(cache_size=1000)
+
+        # 测试多次调用的性能（perf_counter_ns为单调高精度时钟）
+        start_ns = time.perf_counter_ns()
 
         for i in range(50):
             evidence = f"关键词 {i % 10}"
             result = enhancer.enhance_evidence(evidence, large_processed_text)
             assert isinstance(result, list)
 
-        end_time = time.time()
+        elapsed_s = (time.perf_counter_ns() - start_ns) / 1e9
 
         # 性能断言（50次调用应该在合理时间内完成）
-        assert end_time - start_time < 10.0  # 10秒内完成
+        assert elapsed_s < 10.0  # 10秒内完成
 
         # 检查缓存效果
         stats = enhancer.get_cache_stats()
         assert stats["total_requests"] == 50
-        assert stats["hits"] > 0  # 应该有缓存命中
\ No newline at end of file
+        assert stats["hits"] > 0  # 应该有缓存命中
+
+    @pytest.mark.performance
+    @pytest.mark.skipif(importlib.util.find_spec("pytest_benchmark") is None,
+                        reason="需要安装pytest-benchmark")
+    def test_performance_benchmark(self, benchmark, large_processed_text):
+        """用pytest-benchmark统计大数据集下50次调用的耗时分布
+
+        每轮开始前新建增强器并清空模块级的分词、自动机和时间戳缓存，保证测量包含
+        冷缓存路径；可配合 --benchmark-autosave / --benchmark-compare-fail=mean:10% 做回归比对。
+        """
+        def setup():
+            _tokenize_zh.cache_clear()
+            _build_automaton.cache_clear()
+            _normalize_timestamp.cache_clear()
+            return (EvidenceEnhancer(cache_size=1000),), {}
+
+        def run(enhancer):
+            return [
+                enhancer.enhance_evidence(f"关键词 {i % 10}", large_processed_text)
+                for i in range(50)
+            ]
+
+        results = benchmark.pedantic(run, setup=setup, rounds=5, warmup_rounds=2)
+
+        assert len(results) == 50
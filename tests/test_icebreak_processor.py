@@ -7,16 +7,27 @@ that the produced prompt contains an appropriate, safely formatted
 provided).
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock
 
+from src.models.schemas import AnalysisConfig
+
 from src.processors.icebreak_processor import IcebreakProcessor
 
 
 class _FakeLLM:
     """Minimal async LLM stub capturing the last prompt."""
 
-    def __init__(self, response: str) -> None:
+    __slots__ = ("_response", "last_prompt")
+
+    def __init__(self, response: str = "") -> None:
+        self._response = response
+        self.last_prompt = None
+
+    def reset(self, response: str) -> None:
+        """Clear captured state and set the next canned response."""
         self._response = response
         self.last_prompt = None
 
@@ -26,10 +37,29 @@ class _FakeLLM:
         return self._response
 
 
-@pytest.mark.asyncio
-async def test_llm_validate_point_prompt_without_vector():
-    # Arrange: fake engines and processor
-    fake_llm = _FakeLLM(
+@pytest.fixture(scope="module")
+def fake_llm():
+    return _FakeLLM()
+
+
+@pytest.fixture(scope="module")
+def processor(fake_llm):
+    return IcebreakProcessor(
+        vector_engine=MagicMock(),
+        rule_engine=MagicMock(),
+        llm_engine=fake_llm,
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_cache(processor):
+    """Clear the shared processor's LLM cache so every test reaches the fake LLM."""
+    processor._llm_cache.clear()
+
+
+async def test_llm_validate_point_prompt_without_vector(processor, fake_llm):
+    # Arrange: reset the shared fake LLM
+    fake_llm.reset(
         response=(
             "判定结果：是\n"
             "置信度：0.8\n"
@@ -37,11 +67,6 @@ async def test_llm_validate_point_prompt_without_vector():
             "理由：命中了专业身份描述"
         )
     )
-    processor = IcebreakProcessor(
-        vector_engine=MagicMock(),
-        rule_engine=MagicMock(),
-        llm_engine=fake_llm,
-    )
 
     # Act
     result = await processor._llm_validate_point(
@@ -59,10 +84,9 @@ async def test_llm_validate_point_prompt_without_vector():
     assert 0.0 <= result.get("confidence", 0) <= 1.0
 
 
-@pytest.mark.asyncio
-async def test_llm_validate_point_prompt_with_vector_similarity_formatted():
+async def test_llm_validate_point_prompt_with_vector_similarity_formatted(processor, fake_llm):
     # Arrange
-    fake_llm = _FakeLLM(
+    fake_llm.reset(
         response=(
             "判定结果：是\n"
             "置信度：0.75\n"
@@ -70,11 +94,6 @@ async def test_llm_validate_point_prompt_with_vector_similarity_formatted():
             "理由：命中了专业身份描述"
         )
     )
-    processor = IcebreakProcessor(
-        vector_engine=MagicMock(),
-        rule_engine=MagicMock(),
-        llm_engine=fake_llm,
-    )
 
     vector_result = {"similarity": 0.73456, "document": "我是益盟操盘手专员…"}
 
@@ -92,3 +111,68 @@ async def test_llm_validate_point_prompt_with_vector_similarity_formatted():
     assert isinstance(result, dict)
     assert 0.0 <= result.get("confidence", 0) <= 1.0
 
+
+async def test_llm_validate_point_reuses_cached_result(processor, fake_llm):
+    # Arrange: a prompt not seen by the other tests
+    fake_llm.reset(response="判定结果：是\n置信度：0.9\n证据片段：耽误您几分钟\n理由：告知了时间")
+    kwargs = dict(
+        point="time_notice",
+        text="销售：耽误您几分钟时间。",
+        rule_result={"hit": False, "confidence": 0.2},
+        vector_result=None,
+    )
+
+    # Act: the second call must not reach the LLM
+    first = await processor._llm_validate_point(**kwargs)
+    fake_llm.reset(response="判定结果：否\n置信度：0.1\n证据片段：\n理由：无")
+    second = await processor._llm_validate_point(**kwargs)
+
+    # Assert
+    assert fake_llm.last_prompt is None
+    assert second == first
+
+
+async def test_llm_validate_point_does_not_cache_empty_response(processor, fake_llm):
+    # Arrange: the first reply is empty and must not be memoized
+    fake_llm.reset(response="")
+    kwargs = dict(
+        point="value_help",
+        text="销售：帮您看看手里的股票。",
+        rule_result={"hit": False, "confidence": 0.1},
+        vector_result=None,
+    )
+
+    # Act
+    first = await processor._llm_validate_point(**kwargs)
+    fake_llm.reset(response="判定结果：是\n置信度：0.8\n证据片段：帮您看看手里的股票\n理由：提供了帮助")
+    second = await processor._llm_validate_point(**kwargs)
+
+    # Assert: the retry reached the LLM and got the real answer
+    assert first["reasoning"] == "空响应"
+    assert fake_llm.last_prompt is not None
+    assert second["hit"] is True
+
+
+class _MissRuleEngine:
+    """Rule engine stub that never hits, so every point goes on to the LLM."""
+
+    async def detect(self, *args, **kwargs):
+        return {"hit": False, "confidence": 0.0}
+
+
+class _NoVectorEngine:
+    async def search_similar(self, *args, **kwargs):
+        return None
+
+
+async def test_analyze_bounds_llm_concurrency_across_calls(tracking_llm):
+    # Arrange: two concurrent analyses on one processor limited to 2 detections
+    llm_engine = tracking_llm("判定结果：否\n置信度：0.1\n证据片段：\n理由：无")
+    processor = IcebreakProcessor(_NoVectorEngine(), _MissRuleEngine(), llm_engine, max_concurrency=2)
+    processed_text = {"content_analysis": {"sales_content": ["销售：您好，我是益盟操盘手的专员。"]}}
+
+    # Act
+    await asyncio.gather(*(processor.analyze(processed_text, AnalysisConfig()) for _ in range(2)))
+
+    # Assert: 10 point detections ran, never more than 2 LLM calls at once
+    assert llm_engine.peak == 2
@@ -2,7 +2,6 @@
 
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, Mock
 
 from src.models.schemas import (
     CallInput, 
@@ -11,41 +10,6 @@ from src.models.schemas import (
     PainPointQuantificationModel
 )
 from src.processors.pain_point_processor import PainPointProcessor
-from src.engines.vector_engine import VectorSearchEngine
-from src.engines.rule_engine import RuleEngine
-from src.engines.llm_engine import LLMEngine
-
-
-@pytest.fixture(scope="module")
-def mock_engines():
-    """模拟引擎"""
-    vector_engine = Mock(spec=VectorSearchEngine)
-    rule_engine = Mock(spec=RuleEngine)
-    llm_engine = Mock(spec=LLMEngine)
-    
-    # 配置异步mock
-    vector_engine.search_similar = AsyncMock(return_value={
-        'document': '亏损严重的投资案例',
-        'similarity': 0.7,
-        'category': 'pain_point'
-    })
-    
-    rule_engine.detect = AsyncMock(return_value={
-        'hit': True, 
-        'confidence': 0.8, 
-        'evidence': '亏了30万'
-    })
-    
-    llm_engine.generate = AsyncMock(return_value='''
-    {
-        "detected": true,
-        "confidence": 0.9,
-        "evidence_segments": ["亏了30万"],
-        "reasoning": "客户明确提到了严重的投资损失"
-    }
-    ''')
-    
-    return vector_engine, rule_engine, llm_engine
 
 
 @pytest.fixture(scope="module")
@@ -55,7 +19,6 @@ def pain_point_processor(mock_engines):
     return PainPointProcessor(vector_engine, rule_engine, llm_engine)
 
 
-@pytest.mark.asyncio
 async def test_pain_point_detection(pain_point_processor):
     """测试痛点检测"""
     
@@ -88,7 +51,6 @@ async def test_pain_point_detection(pain_point_processor):
     assert result.dominant_pain_type == PainPointType.LOSS
 
 
-@pytest.mark.asyncio
 async def test_multiple_pain_points(pain_point_processor):
     """测试多重痛点检测"""
     
@@ -124,7 +86,41 @@ async def test_multiple_pain_points(pain_point_processor):
     assert chase_high_pain.pain_type == PainPointType.CHASE_HIGH
 
 
-@pytest.mark.asyncio
+async def test_serial_detection_matches_concurrent(pain_point_processor, mock_engines):
+    """测试限制并发为1时检测结果不变"""
+    
+    processed_text = {
+        'content_analysis': {
+            'customer_content': [
+                "我去年炒股亏了30万，错过了腾讯的大涨，现在追高买了很多股票，真是太难了。"
+            ]
+        }
+    }
+    serial_processor = PainPointProcessor(*mock_engines, max_concurrency=1)
+    
+    concurrent = await pain_point_processor.analyze(processed_text, AnalysisConfig())
+    serial = await serial_processor.analyze(processed_text, AnalysisConfig())
+    
+    assert serial.model_dump() == concurrent.model_dump()
+
+
+async def test_concurrency_bounded_across_calls(mock_engines, tracking_llm):
+    """测试同一实例上并发的多次分析共享并发上限"""
+    
+    vector_engine, rule_engine, _ = mock_engines
+    llm_engine = tracking_llm()
+    processor = PainPointProcessor(vector_engine, rule_engine, llm_engine, max_concurrency=2)
+    processed_text = {
+        'content_analysis': {
+            'customer_content': ["我去年炒股亏了30万，真的很后悔。"]
+        }
+    }
+    
+    await asyncio.gather(*(processor.analyze(processed_text, AnalysisConfig()) for _ in range(3)))
+    
+    assert llm_engine.peak == 2
+
+
 async def test_no_pain_points(pain_point_processor):
     """测试无痛点场景"""
     
@@ -155,7 +151,6 @@ async def test_no_pain_points(pain_point_processor):
     assert result.dominant_pain_type is None
 
 
-@pytest.mark.asyncio
 async def test_quantification_reliability(pain_point_processor):
     """测试量化可信度"""
     
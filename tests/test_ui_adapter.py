@@ -1,7 +1,12 @@
 """UI适配器单元测试"""
 
+import functools
+import json
+import logging
+from types import MappingProxyType
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 from datetime import datetime
 
 from src.adapters.ui_adapter import UIAdapter
@@ -12,31 +17,103 @@ from src.models.schemas import (
     CustomerProbingModel
 )
 
+logger = logging.getLogger(__name__)
+
+# UI输出中必须包含的分区
+REQUIRED_SECTIONS = (
+    "customer_side", "standard_actions", "opening", "meta",
+    "metrics", "rejects", "demo", "demo_more"
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _create_large_processed_text(dialogue_count):
+    """创建大量对话的处理文本
+
+    按对话数缓存，多次调用复用同一只读对象；调用方只读取，不得修改
+    """
+    dialogues = tuple(
+        {
+            "content": f"对话内容 {i}，包含各种测试关键词",
+            "timestamp": f"10:{30 + i // 60}:{i % 60:02d}",
+            "speaker": "销售" if i % 2 == 0 else "客户"
+        }
+        for i in range(dialogue_count)
+    )
+    return MappingProxyType({"dialogues": dialogues})
+
+
+# 增强器桩对每条证据返回的固定结果
+_STUB_EVIDENCE = [
+    {
+        "idx": 0,
+        "ts": "2024-01-15 10:30:01",
+        "quote": "测试证据片段",
+        "match_type": "exact",
+        "confidence": 0.9
+    }
+]
+
+
+class _CallRecorder:
+    """轻量调用记录器：只记录位置参数，可通过 side_effect 注入异常"""
+
+    __slots__ = ("_func", "side_effect", "calls")
+
+    def __init__(self, func):
+        self._func = func
+        self.side_effect = None
+        self.calls = []
+
+    def __call__(self, *args):
+        self.calls.append(args)
+        if self.side_effect is not None:
+            raise self.side_effect
+        return self._func(*args)
+
+    def reset(self):
+        self.calls.clear()
+        self.side_effect = None
+
+
+class _StubEnhancer:
+    """证据增强器桩：对每条证据返回固定结果，只记录调用参数"""
+
+    def __init__(self):
+        self.enhance_evidence = _CallRecorder(lambda *args: _STUB_EVIDENCE)
+        self.enhance_evidence_batch = _CallRecorder(self._enhance_batch)
+
+    def _enhance_batch(self, texts, processed_text=None, hints=None):
+        return [self.enhance_evidence(text, processed_text, hint) for text, hint in zip(texts, hints)]
+
+    def get_cache_stats(self):
+        return {}
+
+    def reset(self):
+        self.enhance_evidence.reset()
+        self.enhance_evidence_batch.reset()
+
 
 class TestUIAdapter:
     """UI适配器测试类"""
 
-    @pytest.fixture
-    def mock_evidence_enhancer(self):
-        """模拟证据增强器"""
-        enhancer = Mock(spec=EvidenceEnhancer)
-        enhancer.enhance_evidence.return_value = [
-            {
-                "idx": 0,
-                "ts": "2024-01-15 10:30:01",
-                "quote": "测试证据片段",
-                "match_type": "exact",
-                "confidence": 0.9
-            }
-        ]
-        return enhancer
+    @pytest.fixture(scope="module")
+    def stub_evidence_enhancer(self):
+        """证据增强器桩"""
+        return _StubEnhancer()
 
-    @pytest.fixture
-    def ui_adapter(self, mock_evidence_enhancer):
+    @pytest.fixture(scope="module")
+    def ui_adapter(self, stub_evidence_enhancer):
         """创建UI适配器实例"""
-        return UIAdapter(evidence_enhancer=mock_evidence_enhancer)
+        return UIAdapter(evidence_enhancer=stub_evidence_enhancer)
+
+    @pytest.fixture(autouse=True)
+    def reset_shared_state(self, ui_adapter, stub_evidence_enhancer):
+        """每个测试前清空共享适配器的缓存，并重置增强器桩的调用记录和异常设置"""
+        stub_evidence_enhancer.reset()
+        ui_adapter.clear_cache()
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_analysis_result(self):
         """示例分析结果"""
         return CallAnalysisResult(
@@ -113,7 +190,7 @@ class TestUIAdapter:
             model_version="1.0.0"
         )
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_processed_text(self):
         """示例处理文本"""
         return {
@@ -132,11 +209,7 @@ class TestUIAdapter:
         assert "output" in result
         output = result["output"]
 
-        required_sections = [
-            "customer_side", "standard_actions", "opening", "meta",
-            "metrics", "rejects", "demo", "demo_more"
-        ]
-        for section in required_sections:
+        for section in REQUIRED_SECTIONS:
             assert section in output, f"Missing section: {section}"
 
     def test_map_customer_side(self, ui_adapter, sample_analysis_result):
@@ -250,7 +323,7 @@ class TestUIAdapter:
             assert "effectiveness_score" in depth
             assert "analysis" in depth
 
-    def test_convert_evidence_hit(self, ui_adapter, mock_evidence_enhancer, sample_processed_text):
+    def test_convert_evidence_hit(self, ui_adapter, stub_evidence_enhancer, sample_processed_text):
         """测试证据命中转换"""
         evidence_hit = EvidenceHit(hit=True, evidence="测试证据", confidence=0.8)
 
@@ -262,7 +335,7 @@ class TestUIAdapter:
         assert len(result["evidence"]) > 0
 
         # 验证证据增强器被调用
-        mock_evidence_enhancer.enhance_evidence.assert_called_once()
+        assert len(stub_evidence_enhancer.enhance_evidence.calls) == 1
 
     def test_analyze_depth_effectiveness(self, ui_adapter):
         """测试深度有效性分析"""
@@ -316,6 +389,66 @@ class TestUIAdapter:
         if ui_adapter.enable_cache:
             assert stats2["hits"] > stats1["hits"]
 
+    def test_ui_result_is_plain_json(self, ui_adapter, sample_analysis_result, sample_processed_text):
+        """测试UI结果由普通字典组成，可直接JSON序列化，缓存命中时整体复用"""
+        result1 = ui_adapter.convert_to_ui_format(sample_analysis_result, sample_processed_text)
+        result2 = ui_adapter.convert_to_ui_format(sample_analysis_result, sample_processed_text)
+
+        assert result2 is result1
+        assert all(type(result1["output"][section]) is dict for section in REQUIRED_SECTIONS)
+        assert json.loads(json.dumps(result1, ensure_ascii=False)) == result1
+
+    def test_cache_key_processed_text_identity(self, ui_adapter, sample_analysis_result, sample_processed_text):
+        """测试缓存键按processed_text对象身份区分"""
+        ui_adapter.convert_to_ui_format(sample_analysis_result, sample_processed_text)
+        ui_adapter.convert_to_ui_format(sample_analysis_result, dict(sample_processed_text))
+        ui_adapter.convert_to_ui_format(sample_analysis_result, sample_processed_text)
+
+        stats = ui_adapter.get_cache_stats()
+        assert stats["misses"] == 2
+        assert stats["hits"] == 1
+
+    def test_cache_misses_after_in_place_edit(self, ui_adapter, sample_analysis_result, sample_processed_text):
+        """测试同一processed_text对象的对话被就地修改后不再命中缓存"""
+        processed_text = {"dialogues": [dict(d) for d in sample_processed_text["dialogues"]]}
+        ui_adapter.convert_to_ui_format(sample_analysis_result, processed_text)
+        ui_adapter.convert_to_ui_format(sample_analysis_result, processed_text)
+
+        processed_text["dialogues"][0]["content"] = "销售：内容已修改。"
+        ui_adapter.convert_to_ui_format(sample_analysis_result, processed_text)
+        processed_text["dialogues"].append({"content": "客户：好的。", "timestamp": "", "speaker": "客户"})
+        ui_adapter.convert_to_ui_format(sample_analysis_result, processed_text)
+
+        stats = ui_adapter.get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+
+    def test_cache_key_without_call_id(self, ui_adapter, sample_analysis_result):
+        """测试缺少call_id时按结果内容生成缓存键"""
+        anonymous = sample_analysis_result.model_copy(update={"call_id": ""})
+        same = anonymous.model_copy(deep=True)
+        changed = anonymous.model_copy(update={"sales_id": "sales_002"})
+
+        key = ui_adapter._generate_cache_key(anonymous, None)
+
+        assert key == ui_adapter._generate_cache_key(same, None)
+        assert key != ui_adapter._generate_cache_key(changed, None)
+
+    def test_evidence_fields_enhanced_in_one_batch(self, ui_adapter, sample_analysis_result, sample_processed_text):
+        """测试所有证据字段通过一次批量调用增强"""
+        result = ui_adapter.convert_to_ui_format(sample_analysis_result, sample_processed_text)
+
+        batch_calls = ui_adapter.evidence_enhancer.enhance_evidence_batch.calls
+        assert len(batch_calls) == 1
+        texts, _, hints = batch_calls[0]
+        assert len(texts) == len(hints) == 16
+        assert result["output"]["opening"]["professional_identity"]["evidence"][0]["quote"] == "测试证据片段"
+        assert "coverage" in result["output"]["demo_more"]["bs_explained"]
+
+        # 同一对象再次转换直接命中整体结果缓存，不再调用增强器
+        assert ui_adapter.convert_to_ui_format(sample_analysis_result, sample_processed_text) is result
+        assert len(batch_calls) == 1
+
     def test_fallback_ui_result(self, ui_adapter, sample_analysis_result):
         """测试降级UI结果"""
         fallback = ui_adapter._create_fallback_ui_result(sample_analysis_result)
@@ -327,11 +460,7 @@ class TestUIAdapter:
 
         # 检查所有必需字段都存在
         output = fallback["output"]
-        required_sections = [
-            "customer_side", "standard_actions", "opening", "meta",
-            "metrics", "rejects", "demo", "demo_more"
-        ]
-        for section in required_sections:
+        for section in REQUIRED_SECTIONS:
             assert section in output
 
     def test_error_handling(self, ui_adapter, sample_analysis_result):
@@ -375,9 +504,9 @@ class TestUIAdapter:
         assert "_adapter_metadata" in result
         assert result["_adapter_metadata"]["has_processed_text"] == False
 
-    def test_disabled_cache(self, mock_evidence_enhancer, sample_analysis_result, sample_processed_text):
+    def test_disabled_cache(self, stub_evidence_enhancer, sample_analysis_result, sample_processed_text):
         """测试禁用缓存的情况"""
-        ui_adapter = UIAdapter(evidence_enhancer=mock_evidence_enhancer, enable_cache=False)
+        ui_adapter = UIAdapter(evidence_enhancer=stub_evidence_enhancer, enable_cache=False)
 
         result = ui_adapter.convert_to_ui_format(sample_analysis_result, sample_processed_text)
         stats = ui_adapter.get_cache_stats()
@@ -398,6 +527,17 @@ class TestUIAdapter:
         else:
             assert result["output"]["meta"] == {}
 
+    def test_meta_not_mapped_when_metadata_excluded(self, ui_adapter, sample_analysis_result, sample_processed_text):
+        """测试不包含元数据时不构建meta分区"""
+        with patch.object(ui_adapter, "_map_meta") as map_meta:
+            result = ui_adapter.convert_to_ui_format(
+                sample_analysis_result, sample_processed_text, include_metadata=False
+            )
+
+        map_meta.assert_not_called()
+        assert result["output"]["meta"] == {}
+        assert "_adapter_metadata" not in result
+
 
 # 集成测试
 class TestUIAdapterIntegration:
@@ -535,7 +675,7 @@ class TestUIAdapterIntegration:
 
         # 创建测试数据
         analysis_result = self._create_minimal_analysis_result()
-        processed_text = self._create_large_processed_text(100)  # 100条对话
+        processed_text = _create_large_processed_text(100)  # 100条对话
 
         # 性能测试
         start_time = time.time()
@@ -550,7 +690,8 @@ class TestUIAdapterIntegration:
         total_time = end_time - start_time
         avg_time = total_time / 20
 
-        print(f"平均转换时间: {avg_time:.3f}秒")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("平均转换时间: %.3f秒", avg_time)
         assert avg_time < 1.0, f"转换时间过长: {avg_time}秒"
 
         # 验证缓存效果
@@ -559,27 +700,32 @@ class TestUIAdapterIntegration:
             assert cache_stats["hits"] > 0
 
     def _create_minimal_analysis_result(self):
-        """创建最小的分析结果"""
+        """创建最小的分析结果
+
+        字段均为可信的字面量，使用 model_construct 跳过pydantic校验以降低构建开销
+        """
         from src.models.schemas import EvidenceHit, ActionExecution
 
         # 创建默认的EvidenceHit
-        default_evidence = EvidenceHit(hit=False, evidence="", confidence=0.0)
+        default_evidence = EvidenceHit.model_construct(hit=False, evidence="", confidence=0.0)
+        # 创建默认的ActionExecution
+        default_action = ActionExecution.model_construct(executed=False, count=0)
 
-        return CallAnalysisResult(
+        return CallAnalysisResult.model_construct(
             call_id="perf_test",
             customer_id="customer_perf",
             sales_id="sales_perf",
             call_time="2024-01-15T10:30:00",
             analysis_timestamp=datetime.now().isoformat(),
 
-            icebreak=IcebreakModel(
+            icebreak=IcebreakModel.model_construct(
                 professional_identity=default_evidence,
                 value_help=default_evidence,
                 time_notice=default_evidence,
                 company_background=default_evidence,
                 free_teach=default_evidence
             ),
-            演绎=DeductionModel(
+            演绎=DeductionModel.model_construct(
                 bs_explained=default_evidence,
                 period_resonance_explained=default_evidence,
                 control_funds_explained=default_evidence,
@@ -587,37 +733,23 @@ class TestUIAdapterIntegration:
                 value_quantify_explained=default_evidence,
                 customer_stock_explained=default_evidence
             ),
-            process=ProcessModel(),
-            customer=CustomerModel(),
-            actions=ActionsModel(
-                # 创建默认的ActionExecution
-                professional_identity=ActionExecution(executed=False, count=0),
-                value_help=ActionExecution(executed=False, count=0),
-                time_notice=ActionExecution(executed=False, count=0),
-                company_background=ActionExecution(executed=False, count=0),
-                free_teach=ActionExecution(executed=False, count=0),
-                bs_explained=ActionExecution(executed=False, count=0),
-                period_resonance_explained=ActionExecution(executed=False, count=0),
-                control_funds_explained=ActionExecution(executed=False, count=0),
-                bubugao_explained=ActionExecution(executed=False, count=0),
-                value_quantify_explained=ActionExecution(executed=False, count=0),
-                customer_stock_explained=ActionExecution(executed=False, count=0)
+            process=ProcessModel.model_construct(),
+            customer=CustomerModel.model_construct(),
+            actions=ActionsModel.model_construct(
+                professional_identity=default_action,
+                value_help=default_action,
+                time_notice=default_action,
+                company_background=default_action,
+                free_teach=default_action,
+                bs_explained=default_action,
+                period_resonance_explained=default_action,
+                control_funds_explained=default_action,
+                bubugao_explained=default_action,
+                value_quantify_explained=default_action,
+                customer_stock_explained=default_action
             ),
-            customer_probing=CustomerProbingModel(),
+            customer_probing=CustomerProbingModel.model_construct(),
 
             confidence_score=0.5,
             model_version="1.0.0"
         )
-
-    def _create_large_processed_text(self, dialogue_count):
-        """创建大量对话的处理文本"""
-        return {
-            "dialogues": [
-                {
-                    "content": f"对话内容 {i}，包含各种测试关键词",
-                    "timestamp": f"10:{30 + i // 60}:{i % 60:02d}",
-                    "speaker": "销售" if i % 2 == 0 else "客户"
-                }
-                for i in range(dialogue_count)
-            ]
-        }
\ No newline at end of file